@@ -0,0 +1,57 @@
+"""
+Пропускная способность пула доставки.
+
+Сообщения отправляются через TeleBot в локальную заглушку Telegram
+с задержкой ответа; проверяется, что порядок сообщений в каждом
+чате сохраняется:
+
+    python benchmarks/bench_delivery.py [сообщений] [чатов] [задержка]
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telebot import TeleBot, apihelper  # noqa: E402
+
+from delivery import DeliveryPool  # noqa: E402
+from homework import deliver  # noqa: E402
+from telegram_stub import TelegramStub  # noqa: E402
+
+
+def bench(bot, stub, workers, messages, chats):
+    """Время доставки сообщений пулом из workers воркеров."""
+    stub.calls.clear()
+    pool = DeliveryPool(lambda chat_id, text: deliver(bot, chat_id, text),
+                        workers=workers)
+    started = time.perf_counter()
+    for number in range(messages):
+        pool.submit(number % chats, str(number))
+    pool.close()
+    elapsed = time.perf_counter() - started
+    received = defaultdict(list)
+    for _, _, params in stub.calls:
+        received[params['chat_id']].append(int(params['text']))
+    ordered = all(texts == sorted(texts) for texts in received.values())
+    return elapsed, ordered
+
+
+def main():
+    """Сравнение пулов разного размера."""
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    chats = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    with TelegramStub(delay=delay) as stub:
+        apihelper.API_URL = stub.api_url
+        bot = TeleBot('1234:abcdefg')
+        for workers in (1, 4, 16, 64):
+            elapsed, ordered = bench(bot, stub, workers, messages, chats)
+            print(f'{workers:>3} воркеров: {messages / elapsed:7.1f} '
+                  f'сообщений/с, порядок в чатах '
+                  f'{"сохранён" if ordered else "НАРУШЕН"}')
+
+
+if __name__ == '__main__':
+    main()
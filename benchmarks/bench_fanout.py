@@ -0,0 +1,49 @@
+"""
+Рассылка одного уведомления во множество чатов.
+
+Сообщение о статусе рассылается подписанным чатам через пул доставки
+в локальную заглушку Telegram с задержкой ответа:
+
+    python benchmarks/bench_fanout.py [чатов] [задержка]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telebot import TeleBot, apihelper  # noqa: E402
+
+from engine import Engine  # noqa: E402
+from records import HomeworkRecord, HomeworkStatus  # noqa: E402
+from subscriptions import Subscriptions  # noqa: E402
+from telegram_stub import TelegramStub  # noqa: E402
+from tenants import Tenant  # noqa: E402
+
+
+def main():
+    """Рассылка пулами разного размера."""
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    tenant = Tenant('student', 'token', 0)
+    homework = HomeworkRecord('hw.zip', HomeworkStatus.APPROVED, id=1)
+    subscriptions = Subscriptions({'student': range(1, chats)})
+    with TelegramStub(delay=delay) as stub:
+        apihelper.API_URL = stub.api_url
+        for workers in (1, 16, 64):
+            engine = Engine(
+                TeleBot('1234:abcdefg'), [tenant], delivery_workers=workers
+            )
+            engine.subscriptions = subscriptions
+            stub.calls.clear()
+            started = time.perf_counter()
+            for item in engine.render_stage((tenant, homework)):
+                engine.deliver_stage(item)
+            engine.delivery.close()
+            elapsed = time.perf_counter() - started
+            print(f'{workers:>3} воркеров: {len(stub.calls)} чатов '
+                  f'за {elapsed:5.2f} с')
+
+
+if __name__ == '__main__':
+    main()
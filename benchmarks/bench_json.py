@@ -0,0 +1,75 @@
+"""
+Разбор ответов homework_statuses разного размера.
+
+Сравниваются response.json() из requests, json.loads из байтов
+и orjson.loads (если установлен):
+
+    python benchmarks/bench_json.py [повторов]
+"""
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from decoding import DECODERS  # noqa: E402
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+SIZES = (1, 100, 1000, 10_000)
+
+
+def make_body(count):
+    """Тело ответа с историей из count работ."""
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': 100_000 + number,
+                'status': STATUSES[number % 3],
+                'homework_name': f'student__hw{number % 20:02}.zip',
+                'reviewer_comment': (
+                    'Отличная работа! Обрати внимание на обработку '
+                    'исключений и докстринги. ' * (1 + number % 4)
+                ),
+                'date_updated': '2024-04-11T10:31:09Z',
+                'lesson_name': f'Проект спринта {number % 20}: Бот',
+            }
+            for number in range(count)
+        ],
+        'current_date': 1712831469,
+    }, ensure_ascii=False).encode()
+
+
+def make_response(body):
+    """Ответ requests с заданным телом."""
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = body
+    response.encoding = None
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
+
+def main():
+    """Запуск сравнения."""
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    decoders = {'response.json': lambda body: make_response(body).json()}
+    decoders.update(
+        (f'{name}.loads', loads) for name, loads in DECODERS.items()
+    )
+    for size in SIZES:
+        body = make_body(size)
+        rounds = max(repeat, repeat * 1000 // size)
+        print(f'Работ: {size}, тело {len(body) / 1024:.0f} КиБ')
+        for title, decode in decoders.items():
+            started = time.perf_counter()
+            for _ in range(rounds):
+                decode(body)
+            elapsed = (time.perf_counter() - started) / rounds
+            print(f'{title:>15}: {elapsed * 1e6:10.1f} мкс')
+
+
+if __name__ == '__main__':
+    main()
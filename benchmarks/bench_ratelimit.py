@@ -0,0 +1,59 @@
+"""
+Доля ответов 429 при опросе API с ограничением частоты.
+
+Потоки опрашивают локальную заглушку API, пропускающую не более
+LIMIT запросов в секунду, без общего бюджета запросов и с бюджетом
+practicum_bucket, настроенным ниже лимита:
+
+    python benchmarks/bench_ratelimit.py [запросов] [потоков]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from practicum_stub import PracticumStub  # noqa: E402
+from ratelimit import TokenBucket  # noqa: E402
+
+LIMIT = 50
+
+
+def poll(_):
+    """Один запрос статусов; ошибки учитываются заглушкой."""
+    try:
+        homework.fetch_statuses(0, homework.HEADERS)
+    except Exception:
+        pass
+
+
+def run(requests_qty, threads, bucket):
+    """Запуск нагрузки с указанным бюджетом запросов."""
+    homework.practicum_bucket = bucket
+    with PracticumStub(rate_limit=LIMIT) as stub:
+        homework.ENDPOINT = stub.endpoint
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(poll, range(requests_qty)))
+        elapsed = time.perf_counter() - started
+    return stub.codes, elapsed
+
+
+def main():
+    """Сравнение опроса без бюджета и с бюджетом."""
+    requests_qty = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    for title, bucket in (
+        ('без бюджета', TokenBucket(1e9)),
+        ('с бюджетом', TokenBucket(LIMIT * 0.9, capacity=1)),
+    ):
+        codes, elapsed = run(requests_qty, threads, bucket)
+        total = sum(codes.values())
+        print(f'{title:>12}: 429 в {codes[429] / total:6.1%} ответов, '
+              f'{total / elapsed:6.1f} запросов/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Сравнение RSS при хранении 100 тыс. домашних работ.
+
+Вариант dict хранит словари из ответа API целиком,
+вариант record хранит записи HomeworkRecord.
+Каждый вариант запускается в отдельном процессе:
+
+    python benchmarks/bench_records_memory.py [count]
+"""
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import HomeworkRecord  # noqa: E402
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def rss_kib():
+    """Текущий RSS процесса в КиБ."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def api_homework(number):
+    """Домашняя работа в том виде, в котором её возвращает API."""
+    return {
+        'id': 100000000 + number,
+        'status': STATUSES[number % 3],
+        'homework_name': f'student{number}__hw{number % 17}.zip',
+        'reviewer_comment': f'Комментарий ревьюера к работе {number}',
+        'date_updated': f'2024-0{number % 9 + 1}-11T10:31:{number % 60:02}Z',
+        'lesson_name': f'Проект спринта {number % 17}',
+    }
+
+
+def measure(variant, count):
+    """Прирост RSS после загрузки count домашних работ."""
+    before = rss_kib()
+    if variant == 'dict':
+        tracked = [api_homework(number) for number in range(count)]
+    else:
+        tracked = [
+            HomeworkRecord.from_api(api_homework(number))
+            for number in range(count)
+        ]
+    after = rss_kib()
+    assert len(tracked) == count
+    return after - before
+
+
+def main():
+    """Запуск обоих вариантов в дочерних процессах."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    results = {}
+    for variant in ('dict', 'record'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--variant', variant, str(count)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[variant] = int(output)
+        print(f'{variant:>6}: {results[variant] / 1024:8.1f} МиБ '
+              f'на {count} домашних работ')
+    saving = 1 - results['record'] / results['dict']
+    print(f'Экономия: {saving:.0%}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--variant':
+        print(measure(sys.argv[2], int(sys.argv[3])))
+    else:
+        main()
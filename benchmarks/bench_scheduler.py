@@ -0,0 +1,50 @@
+"""
+Стоимость перепланирования и равномерность опросов.
+
+Для 1 тыс., 10 тыс. и 100 тыс. арендаторов измеряется время одного
+извлечения и перепланирования срока, а также максимальное число
+опросов за секунду периода RETRY_PERIOD:
+
+    python benchmarks/bench_scheduler.py
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import DeadlineScheduler  # noqa: E402
+
+PERIOD = 600
+OPERATIONS = 200_000
+
+
+def bench(size):
+    """Среднее время перепланирования и пик опросов в секунду."""
+    scheduler = DeadlineScheduler()
+    scheduler.spread(range(size), PERIOD, 0)
+    per_second = Counter(
+        int(scheduler.deadline(key)) for key in range(size)
+    )
+    now = 0.0
+    started = time.perf_counter()
+    for _ in range(OPERATIONS):
+        now = scheduler.next_deadline()
+        for key, deadline in scheduler.pop_due(now, limit=1):
+            scheduler.schedule(key, deadline + PERIOD)
+    elapsed = time.perf_counter() - started
+    return elapsed / OPERATIONS, max(per_second.values())
+
+
+def main():
+    """Вывод результатов для разных размеров."""
+    for size in (1_000, 10_000, 100_000):
+        cost, peak = bench(size)
+        print(f'{size:>7} арендаторов: {cost * 1e6:6.2f} мкс на '
+              f'перепланирование, пик {peak} опросов/с '
+              f'(в среднем {size / PERIOD:.1f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Проверка больших ответов API со смесью корректных и некорректных работ.
+
+Сравнивается разбор каждой работы через HomeworkRecord.from_api
+с перехватом исключений и пакетная проверка HomeworkValidator:
+
+    python benchmarks/bench_validation.py [работ] [доля некорректных]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import HomeworkRecord  # noqa: E402
+from validation import HomeworkValidator  # noqa: E402
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def make_homeworks(count, invalid_share):
+    """Список работ, доля invalid_share из которых некорректна."""
+    homeworks = []
+    for number in range(count):
+        homework = {
+            'id': number,
+            'status': STATUSES[number % 3],
+            'homework_name': f'hw{number}.zip',
+            'reviewer_comment': 'Принято!',
+            'date_updated': '2024-04-11T10:31:09Z',
+            'lesson_name': 'Проект спринта',
+        }
+        if random.random() < invalid_share:
+            if number % 2:
+                del homework['homework_name']
+            else:
+                homework['status'] = 'unknown'
+        homeworks.append(homework)
+    return homeworks
+
+
+def parse_one_by_one(homeworks):
+    """Разбор с перехватом исключения на каждой некорректной работе."""
+    records = []
+    for homework in homeworks:
+        try:
+            records.append(HomeworkRecord.from_api(homework))
+        except KeyError:
+            pass
+    return records
+
+
+def main():
+    """Запуск сравнения."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    invalid_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    random.seed(0)
+    homeworks = make_homeworks(count, invalid_share)
+    validator = HomeworkValidator(STATUSES)
+    for title, check in (
+        ('from_api', parse_one_by_one),
+        ('validator', lambda items: validator.validate_many(items)[0]),
+    ):
+        started = time.perf_counter()
+        records = check(homeworks)
+        elapsed = time.perf_counter() - started
+        print(f'{title:>9}: {elapsed * 1000:7.1f} мс, '
+              f'корректных {len(records)} из {count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Пик запросов к API после перезапуска engine.py.
+
+Для 10 тыс. арендаторов сравнивается число опросов в секунду
+в первый период RETRY_PERIOD после старта: все опросы сразу,
+равномерное распределение без сохранённого состояния
+и восстановление расписания после простоя разной длины:
+
+    python benchmarks/bench_warm_start.py [арендаторов]
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import Engine  # noqa: E402
+from tenants import Tenant  # noqa: E402
+
+PERIOD = 600
+DOWNTIMES = (30, 120, 3600)
+
+
+def peak_rps(engine):
+    """Наибольшее число опросов за одну секунду первого периода."""
+    per_second = Counter(
+        int(deadline) for _, deadline in engine.scheduler.items()
+        if deadline < PERIOD
+    )
+    return max(per_second.values())
+
+
+def make_state(count, downtime):
+    """Расписание, сохранённое за downtime секунд до перезапуска."""
+    stopped = time.time() - downtime
+    step = PERIOD / count
+    return {
+        f't{number}': (stopped + number * step, int(stopped), None)
+        for number in range(count)
+    }
+
+
+def main():
+    """Запуск сравнения."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    tenants = [Tenant(f't{number}', 'token', number)
+               for number in range(count)]
+
+    def make_engine():
+        return Engine(None, tenants, period=PERIOD, clock=lambda: 0.0)
+
+    engine = make_engine()
+    for name in engine.tenants:
+        engine.scheduler.schedule(name, 0)
+    print(f'{"все сразу":>28}: {peak_rps(engine):6} опросов/с')
+    print(f'{"равномерно, без состояния":>28}: '
+          f'{peak_rps(make_engine()):6} опросов/с')
+    for downtime in DOWNTIMES:
+        engine = make_engine()
+        engine.restore(make_state(count, downtime))
+        print(f'{f"восстановление после {downtime} с":>28}: '
+              f'{peak_rps(engine):6} опросов/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Локальная заглушка API Я.Практикум для бенчмарков.
+
+Отвечает на запросы статусов домашних работ с задержкой delay
+и, при заданном rate_limit, возвращает 429 с Retry-After на запросы
+сверх rate_limit в секунду. Подключение:
+
+    with PracticumStub(rate_limit=20) as stub:
+        homework.ENDPOINT = stub.endpoint
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PracticumStub:
+    """HTTP-сервер, имитирующий API статусов домашних работ."""
+
+    def __init__(self, delay=0.0, rate_limit=None, homeworks=None,
+                 host='127.0.0.1', port=0):
+        self.delay = delay
+        self.rate_limit = rate_limit
+        self.homeworks = homeworks or []
+        self.codes = Counter()
+        self.per_second = Counter()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def endpoint(self):
+        """Адрес эндпоинта для homework.ENDPOINT."""
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/user_api/homework_statuses/'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def admit(self):
+        """Код ответа с учётом ограничения частоты."""
+        second = int(time.monotonic())
+        with self._lock:
+            self.per_second[second] += 1
+            limited = (
+                self.rate_limit is not None
+                and self.per_second[second] > self.rate_limit
+            )
+            code = 429 if limited else 200
+            self.codes[code] += 1
+        return code
+
+    def current_delay(self):
+        """Задержка ответа; переопределяется для деградации."""
+        return self.delay
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                code = stub.admit()
+                delay = stub.current_delay()
+                if delay:
+                    time.sleep(delay)
+                if code == 200:
+                    body = {
+                        'homeworks': stub.homeworks,
+                        'current_date': int(time.time()),
+                    }
+                else:
+                    body = {'code': 'throttled'}
+                payload = json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(code)
+                if code == 429:
+                    self.send_header('Retry-After', '1')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
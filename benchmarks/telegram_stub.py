@@ -0,0 +1,91 @@
+"""
+Локальная заглушка Telegram Bot API для бенчмарков.
+
+Отвечает на sendMessage, editMessageText и getChat с заданной
+задержкой и запоминает все вызовы. Подключение к TeleBot:
+
+    with TelegramStub(delay=0.02) as stub:
+        apihelper.API_URL = stub.api_url
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class TelegramStub:
+    """HTTP-сервер, имитирующий Telegram Bot API."""
+
+    def __init__(self, delay=0.0, host='127.0.0.1', port=0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+        self._message_ids = iter(range(1, 1 << 62))
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def api_url(self):
+        """Шаблон адреса для telebot.apihelper.API_URL."""
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/bot{{0}}/{{1}}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, token, method, params):
+        """Результат вызова метода API."""
+        with self._lock:
+            self.calls.append((token, method, params))
+            message_id = next(self._message_ids)
+        chat = {'id': int(params.get('chat_id', 0)), 'type': 'private'}
+        if method == 'getChat':
+            return chat
+        if method == 'editMessageText':
+            message_id = int(params['message_id'])
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': chat,
+            'text': params.get('text', ''),
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                _, token, method = url.path.split('/', 2)
+                params = dict(parse_qsl(url.query))
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    params.update(parse_qsl(self.rfile.read(length).decode()))
+                if stub.delay:
+                    time.sleep(stub.delay)
+                body = json.dumps({
+                    'ok': True,
+                    'result': stub.respond(token[3:], method, params),
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,114 @@
+"""
+Пул ботов Telegram.
+
+Telegram ограничивает частоту отправки для каждого бота, поэтому
+при большом числе чатов сообщения распределяются между несколькими
+ботами. Чат закрепляется за ботом рандеву-хешированием (HRW): для
+каждого бота считается crc32 от его токена и ID чата, чат достаётся
+боту с наибольшим значением. Все сообщения в чат, в том числе
+изменения отправленных, идут от одного бота, а при добавлении или
+удалении токена переезжают только чаты добавленного или удалённого
+бота. У каждого бота своя корзина токенов, а ответ 429 приостанавливает
+только этого бота на время retry_after, после чего вызов повторяется.
+"""
+import logging
+import time
+import zlib
+
+from telebot import apihelper
+
+from metrics import registry
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+TOO_MANY_REQUESTS = 429
+
+
+class BotPool:
+    """Набор ботов с интерфейсом одного бота.
+
+    Поддерживаются send_message, edit_message_text и get_chat,
+    остальные атрибуты берутся у первого бота.
+    """
+
+    def __init__(self, bots, rate=30, capacity=None, retries=3,
+                 metrics=registry, clock=time.monotonic, sleep=time.sleep):
+        if not bots:
+            raise ValueError('Пул ботов не может быть пустым')
+        self.bots = list(bots)
+        self.keys = [
+            str(getattr(bot, 'token', index)).encode()
+            for index, bot in enumerate(self.bots)
+        ]
+        self.buckets = [
+            TokenBucket(rate, capacity, clock=clock, sleep=sleep)
+            for _ in self.bots
+        ]
+        self.retries = retries
+        self.metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self.bots[0], name)
+
+    def __len__(self):
+        return len(self.bots)
+
+    def index_for(self, chat_id):
+        """Номер бота, за которым закреплён чат.
+
+        Закрепление зависит от токенов ботов, а не от их порядка.
+        """
+        chat = f':{chat_id}'.encode()
+        return max(
+            range(len(self.bots)),
+            key=lambda index: zlib.crc32(self.keys[index] + chat)
+        )
+
+    def _call(self, method, *args, **kwargs):
+        """Вызов метода бота с повтором после ответа 429.
+
+        Повтор ждёт окончания паузы в корзине бота; после retries
+        повторов исключение пробрасывается.
+        """
+        index = self.index_for(kwargs['chat_id'])
+        bucket = self.buckets[index]
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            try:
+                result = getattr(self.bots[index], method)(*args, **kwargs)
+            except apihelper.ApiTelegramException as error:
+                if error.error_code != TOO_MANY_REQUESTS:
+                    raise
+                retry_after = (
+                    error.result_json.get('parameters') or {}
+                ).get('retry_after', 1)
+                bucket.pause(retry_after)
+                self.metrics.increment('telegram_rate_limited', bot=index)
+                if attempt == self.retries:
+                    raise
+                logger.warning(
+                    f'Бот {index} превысил лимит отправки, '
+                    f'повтор через {retry_after} с'
+                )
+                continue
+            self.metrics.increment('telegram_calls', bot=index)
+            return result
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Отправка сообщения ботом, закреплённым за чатом."""
+        return self._call(
+            'send_message', chat_id=chat_id, text=text, **kwargs
+        )
+
+    def edit_message_text(self, text, chat_id=None, message_id=None,
+                          **kwargs):
+        """Изменение сообщения ботом, который его отправил."""
+        return self._call(
+            'edit_message_text', text, chat_id=chat_id,
+            message_id=message_id, **kwargs
+        )
+
+    def get_chat(self, chat_id):
+        """Сведения о чате от бота, закреплённого за ним."""
+        return self._call('get_chat', chat_id=chat_id)
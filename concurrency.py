@@ -0,0 +1,142 @@
+"""
+Адаптивное ограничение числа одновременных запросов.
+
+AdaptiveLimiter работает по схеме AIMD: пока задержка ответов
+держится у своего долгосрочного уровня и лимит используется хотя бы
+наполовину, лимит растёт на единицу за каждый «круг» из limit запросов.
+Когда короткое среднее задержки превышает долгосрочное в tolerance раз
+или API отвечает временной ошибкой (5xx, сбой соединения, 429), лимит
+умножается на backoff. Снижение выполняется не чаще раза за время
+одного ответа, чтобы пачка медленных ответов одного круга не обрушила
+лимит до минимума. Текущий лимит публикуется в метрике
+concurrency_limit.
+
+Лимитом оборачивается только HTTP-запрос, без ожидания общей корзины
+токенов и пауз между повторами: иначе собственное ограничение частоты
+и задержки повторов выглядели бы как рост задержки API.
+"""
+import threading
+import time
+from http import HTTPStatus
+
+import requests
+
+from exceptions import EndpointException, RateLimitException
+from metrics import registry
+
+CONGESTION_CODES = (
+    HTTPStatus.REQUEST_TIMEOUT, HTTPStatus.TOO_MANY_REQUESTS
+)
+
+
+def is_congestion(error):
+    """Ошибка, говорящая о перегрузке API, а не о проблеме запроса."""
+    return isinstance(
+        error, (RateLimitException, requests.RequestException)
+    ) or (isinstance(error, EndpointException) and error.retryable)
+
+
+def is_congested_response(response):
+    """Ответ, говорящий о перегрузке API: 408, 429 или 5xx."""
+    code = getattr(response, 'status_code', None)
+    return code is not None and (
+        code in CONGESTION_CODES or code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+class AdaptiveLimiter:
+    """Лимит одновременных запросов с обратной связью по задержке."""
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, tolerance=2.0,
+                 backoff=0.5, smoothing=0.2, baseline_smoothing=0.02,
+                 name='practicum', clock=time.monotonic, metrics=registry):
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+        self.name = name
+        self.clock = clock
+        self.metrics = metrics
+        self.in_flight = 0
+        self.latency = None
+        self.baseline = None
+        self.cut_at = None
+        self._condition = threading.Condition()
+        self._report()
+
+    def _report(self):
+        self.metrics.set(
+            'concurrency_limit', int(self.limit), upstream=self.name
+        )
+        self.metrics.set(
+            'concurrency_in_flight', self.in_flight, upstream=self.name
+        )
+
+    def acquire(self):
+        """Ожидание свободного места в пределах лимита."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            self._report()
+
+    def release(self, latency=None, congested=False, failed=False):
+        """Освобождение места и учёт результата запроса.
+
+        latency — задержка успешного ответа в секундах (None, если
+        её не нужно учитывать), congested — признак перегрузки API,
+        failed — запрос завершился ошибкой. Ошибка без перегрузки
+        (например, 401 или неразборчивый ответ) лимит не меняет.
+        """
+        with self._condition:
+            saturated = self.in_flight * 2 >= self.limit
+            self.in_flight -= 1
+            if latency is not None and not congested:
+                self._observe(latency)
+                congested = self.latency > self.baseline * self.tolerance
+            if congested:
+                self._decrease()
+            elif saturated and not failed:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._report()
+            self._condition.notify_all()
+
+    def _observe(self, latency):
+        if self.latency is None:
+            self.latency = self.baseline = latency
+            return
+        self.latency += self.smoothing * (latency - self.latency)
+        rate = (
+            self.smoothing if latency < self.baseline
+            else self.baseline_smoothing
+        )
+        self.baseline += rate * (latency - self.baseline)
+
+    def _decrease(self):
+        now = self.clock()
+        if self.cut_at is not None and now - self.cut_at < (self.latency or 0):
+            return
+        self.cut_at = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def call(self, func, *args, **kwargs):
+        """Вызов func в пределах лимита с учётом его задержки и ошибок.
+
+        Если func возвращает HTTP-ответ о перегрузке (408, 429, 5xx),
+        он учитывается как ошибка перегрузки.
+        """
+        self.acquire()
+        started = self.clock()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.release(congested=is_congestion(error), failed=True)
+            raise
+        if is_congested_response(result):
+            self.release(congested=True, failed=True)
+        else:
+            self.release(self.clock() - started)
+        return result
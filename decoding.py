@@ -0,0 +1,38 @@
+"""
+Разбор JSON-ответов API.
+
+Тело ответа разбирается напрямую из байтов, без промежуточной
+строки requests. Если установлен orjson, используется он, иначе
+стандартный json; выбор можно задать переменной JSON_DECODER
+(orjson или json). Ошибки разбора обоих декодеров — ValueError.
+"""
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS = {'json': json.loads}
+if orjson is not None:
+    DECODERS['orjson'] = orjson.loads
+
+JSON_DECODER = os.getenv(
+    'JSON_DECODER', 'orjson' if orjson is not None else 'json'
+)
+if JSON_DECODER not in DECODERS:
+    raise ValueError(f'Декодер JSON {JSON_DECODER} недоступен')
+loads = DECODERS[JSON_DECODER]
+
+
+def decode_json(response):
+    """Тело ответа в виде JSON.
+
+    Ответы без байтового тела (заглушки в тестах) разбираются
+    их собственным методом json().
+    """
+    content = getattr(response, 'content', None)
+    if not isinstance(content, (bytes, bytearray)) or not content:
+        return response.json()
+    return loads(content)
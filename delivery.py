@@ -0,0 +1,192 @@
+"""
+Параллельная доставка сообщений.
+
+Сообщения распределяются между воркерами по ID чата: сообщения
+в разные чаты отправляются параллельно, а в один чат — строго
+в порядке поступления, так как их отправляет один и тот же воркер.
+
+У каждого воркера две полосы (lanes): уведомления о статусах работ
+(STATUS) и служебные сообщения об ошибках (ALERT). Воркер берёт
+сообщение из полосы ALERT, только когда его полоса STATUS пуста, поэтому
+во время сбоя сообщения об ошибках не задерживают уведомления
+о статусах в тех же разделах. Приоритет действует внутри раздела,
+а не глобально: воркер с пустой полосой STATUS отправляет сообщения
+об ошибках, даже если в других разделах ждут уведомления о статусах,
+и расходует общий лимит отправки бота. Глобальный приоритет нарушил бы
+порядок сообщений в чат, который обеспечивает закрепление чата
+за воркером. При заполненной полосе STATUS отправитель ждёт, а при
+заполненной полосе ALERT отбрасывается самое старое сообщение.
+"""
+import logging
+import threading
+import zlib
+from collections import deque
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+STATUS = 'status'
+ALERT = 'alert'
+LANES = (STATUS, ALERT)
+
+
+def partition(chat_id, partitions):
+    """Номер раздела для чата.
+
+    Используется crc32, а не hash(), чтобы номер не зависел
+    от PYTHONHASHSEED и совпадал между перезапусками.
+    """
+    return zlib.crc32(str(chat_id).encode()) % partitions
+
+
+class LaneQueue:
+    """Очередь воркера с полосами STATUS и ALERT.
+
+    Сообщения выдаются из полосы STATUS, пока она не пуста.
+    Очереди других воркеров не учитываются.
+    """
+
+    def __init__(self, maxsize=1000, alert_maxsize=100, metrics=registry):
+        self.maxsize = {STATUS: maxsize, ALERT: alert_maxsize}
+        self.lanes = {lane: deque() for lane in LANES}
+        self.metrics = metrics
+        self.unfinished = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+
+    def put(self, item, lane=STATUS):
+        """Постановка сообщения в полосу.
+
+        При заполненной полосе STATUS вызов блокируется,
+        в полосе ALERT вытесняется самое старое сообщение.
+        """
+        with self._lock:
+            jobs = self.lanes[lane]
+            if len(jobs) >= self.maxsize[lane]:
+                if lane == STATUS:
+                    while len(jobs) >= self.maxsize[lane]:
+                        self._not_full.wait()
+                else:
+                    jobs.popleft()
+                    self.unfinished -= 1
+                    self.metrics.increment('delivery_dropped', lane=lane)
+                    self.metrics.increment(
+                        'delivery_queue_depth', -1, lane=lane
+                    )
+            jobs.append(item)
+            self.unfinished += 1
+            self.metrics.increment('delivery_queue_depth', lane=lane)
+            self._not_empty.notify()
+
+    def get(self):
+        """Следующее сообщение: из полосы STATUS, затем из ALERT.
+
+        После close() и опустошения полос возвращается STOP.
+        """
+        with self._lock:
+            while True:
+                for lane in LANES:
+                    if self.lanes[lane]:
+                        item = self.lanes[lane].popleft()
+                        self.metrics.increment(
+                            'delivery_queue_depth', -1, lane=lane
+                        )
+                        if lane == STATUS:
+                            self._not_full.notify()
+                        return item
+                if self.closed:
+                    return STOP
+                self._not_empty.wait()
+
+    def depth(self, lane):
+        """Число сообщений в полосе."""
+        with self._lock:
+            return len(self.lanes[lane])
+
+    def task_done(self):
+        """Отметка об обработке сообщения."""
+        with self._lock:
+            self.unfinished -= 1
+            if self.unfinished <= 0:
+                self._all_done.notify_all()
+
+    def join(self):
+        """Ожидание обработки всех сообщений."""
+        with self._lock:
+            while self.unfinished > 0:
+                self._all_done.wait()
+
+    def close(self):
+        """Выдача STOP после обработки оставшихся сообщений."""
+        with self._lock:
+            self.closed = True
+            self._not_empty.notify_all()
+
+
+class DeliveryPool:
+    """Пул воркеров доставки с разделением по ID чата."""
+
+    def __init__(self, send, workers=4, maxsize=1000, alert_maxsize=100,
+                 metrics=registry):
+        if workers < 1:
+            raise ValueError('Размер пула доставки должен быть больше 0')
+        self.send = send
+        self.queues = [
+            LaneQueue(maxsize, alert_maxsize, metrics) for _ in range(workers)
+        ]
+        self.threads = [
+            threading.Thread(
+                target=self._work, args=(jobs,),
+                name=f'delivery-{number}', daemon=True
+            )
+            for number, jobs in enumerate(self.queues)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, chat_id, *args, lane=STATUS):
+        """Постановка сообщения в полосу lane очереди воркера чата.
+
+        При заполненной полосе STATUS вызов блокируется до освобождения
+        места, при заполненной полосе ALERT вытесняется старое сообщение.
+        """
+        self.queues[partition(chat_id, len(self.queues))].put(
+            (chat_id, args), lane
+        )
+
+    def depths(self):
+        """Число сообщений в каждой полосе по всем воркерам."""
+        return {
+            lane: sum(jobs.depth(lane) for jobs in self.queues)
+            for lane in LANES
+        }
+
+    def _work(self, jobs):
+        while True:
+            job = jobs.get()
+            if job is STOP:
+                return
+            chat_id, args = job
+            try:
+                self.send(chat_id, *args)
+            except Exception as error:
+                logger.error(f'Ошибка доставки в чат {chat_id}: {error}')
+            finally:
+                jobs.task_done()
+
+    def join(self):
+        """Ожидание доставки всех поставленных сообщений."""
+        for jobs in self.queues:
+            jobs.join()
+
+    def close(self):
+        """Доставка оставшихся сообщений и остановка воркеров."""
+        for jobs in self.queues:
+            jobs.close()
+        for thread in self.threads:
+            thread.join()
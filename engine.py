@@ -0,0 +1,539 @@
+"""
+Опрос статусов домашних работ множества арендаторов.
+
+Каждый арендатор опрашивается раз в RETRY_PERIOD по собственному
+сроку, сроки равномерно распределены по периоду, чтобы запросы
+к API не приходили одновременно.
+
+Запуск: python engine.py (арендаторы читаются из реестра TENANTS_DB
+или из файла TENANTS_FILE).
+"""
+import logging
+import os
+import socket
+import threading
+import time
+
+from telebot import TeleBot
+
+from botpool import BotPool
+from concurrency import AdaptiveLimiter
+from delivery import ALERT, STATUS, DeliveryPool
+from exceptions import RateLimitException
+from homework import (
+    DEFAULT_TENANT, PRACTICUM_TOKEN, RETRY_PERIOD, TELEGRAM_CHAT_ID,
+    TELEGRAM_TOKEN, check_homeworks, check_tokens, deliver, edit_or_deliver,
+    fetch_statuses, instrument_bot, parse_status, record_delivery,
+    record_transition, start_memory_guard, start_watchdog
+)
+from leases import ShardLeaser, SQLiteLeaseStore, shard_of
+from message_ids import MessageIds
+from pipeline import Pipeline, Stage
+from retry import RetryPolicy
+from scheduler import DeadlineScheduler
+from sinks import (
+    Notifier, SinkWorker, SmtpSink, WebhookSink, load_smtp_routes
+)
+from state import ScheduleStore
+from subscriptions import Subscriptions, load_subscriptions
+from tenants import Tenant, TenantRegistry, load_tenants
+from transitions import TransitionIndex
+
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+TENANTS_DB = os.getenv('TENANTS_DB')
+DELIVERY_WORKERS = int(os.getenv('DELIVERY_WORKERS', 0))
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE')
+EDIT_MESSAGES = os.getenv('EDIT_MESSAGES', 'false').lower() == 'true'
+LEASE_DB = os.getenv('LEASE_DB')
+STATE_DB = os.getenv('STATE_DB')
+STATE_SAVE_INTERVAL = int(os.getenv('STATE_SAVE_INTERVAL', 60))
+LEASE_SHARDS = int(os.getenv('LEASE_SHARDS', 16))
+LEASE_TTL = int(os.getenv('LEASE_TTL', 30))
+PIPELINE_WORKERS = os.getenv('PIPELINE_WORKERS')
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', 0))
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+SMTP_HOST = os.getenv('SMTP_HOST')
+SMTP_PORT = int(os.getenv('SMTP_PORT', 25))
+SMTP_SENDER = os.getenv('SMTP_SENDER', 'homework-bot@localhost')
+SMTP_RECIPIENTS = os.getenv('SMTP_RECIPIENTS', '')
+SMTP_ROUTES_FILE = os.getenv('SMTP_ROUTES_FILE')
+WEBHOOK_RETRY_ATTEMPTS = int(os.getenv('WEBHOOK_RETRY_ATTEMPTS', 3))
+WEBHOOK_RETRY_DELAY = float(os.getenv('WEBHOOK_RETRY_DELAY', 0.5))
+SMTP_RETRY_ATTEMPTS = int(os.getenv('SMTP_RETRY_ATTEMPTS', 3))
+SMTP_RETRY_DELAY = float(os.getenv('SMTP_RETRY_DELAY', 0.5))
+TELEGRAM_TOKENS = os.getenv('TELEGRAM_TOKENS')
+TELEGRAM_RPS = float(os.getenv('TELEGRAM_RPS', 30))
+REPLICA_ID = os.getenv('REPLICA_ID', f'{socket.gethostname()}-{os.getpid()}')
+
+logger = logging.getLogger(__name__)
+
+
+class Engine:
+    """Цикл опроса арендаторов по расписанию."""
+
+    def __init__(self, bot, tenants, period=RETRY_PERIOD,
+                 clock=time.monotonic, delivery_workers=0):
+        self.bot = bot
+        self.delivery = None
+        if delivery_workers:
+            self.delivery = DeliveryPool(self.send, delivery_workers)
+        self.period = period
+        self.clock = clock
+        self.tenants = {tenant.name: tenant for tenant in tenants}
+        self.timestamps = dict.fromkeys(self.tenants, int(time.time()))
+        self.last_errors = {}
+        self.disabled = {}
+        self.watchdog = None
+        self.leaser = None
+        self.limiter = None
+        self.state_store = None
+        self.state_saved = clock()
+        self.subscriptions = Subscriptions()
+        self.pipeline = None
+        self.notifier = None
+        self._lock = threading.Lock()
+        self.message_ids = None
+        self.transitions = TransitionIndex()
+        self.scheduler = DeadlineScheduler()
+        self.scheduler.spread(self.tenants, period, clock())
+
+    def send(self, chat_id, message, homework=None, tenant=None):
+        """Синхронная отправка сообщения в чат.
+
+        Если хранятся ID сообщений (EDIT_MESSAGES), сообщение о статусе
+        работы homework изменяет ранее отправленное сообщение о ней.
+        Задержка уведомления арендатора tenant учитывается один раз
+        на переход — при доставке в чат самого арендатора, а не
+        в каждый чат подписчиков.
+        """
+        if homework is None or self.message_ids is None:
+            delivered = deliver(self.bot, chat_id, message) is not None
+        else:
+            key = homework.key
+            delivered, message_id = edit_or_deliver(
+                self.bot, chat_id, message, self.message_ids.get(chat_id, key)
+            )
+            if delivered and message_id is not None:
+                self.message_ids.set(chat_id, key, message_id)
+        if not delivered:
+            return None
+        if homework is not None and self.is_tenant_chat(tenant, chat_id):
+            record_delivery(tenant, homework)
+        return message
+
+    def is_tenant_chat(self, name, chat_id):
+        """Проверка, что chat_id — чат самого арендатора name."""
+        tenant = self.tenants.get(name)
+        return tenant is not None and tenant.chat_id == chat_id
+
+    def publish(self, chat_id, message):
+        """Передача события в дополнительные каналы (вебхук, SMTP).
+
+        Каналы получают событие один раз, через свои очереди,
+        и не задерживают отправку в Telegram.
+        """
+        if self.notifier is not None:
+            self.notifier.notify(chat_id, message)
+
+    def notify(self, chat_id, message, homework=None, tenant=None):
+        """Отправка сообщения в Telegram напрямую или через пул доставки.
+
+        Сообщения о статусе работы идут в пуле доставки в полосе STATUS,
+        остальные (об ошибках) — в полосе ALERT с меньшим приоритетом.
+        """
+        if self.delivery is None:
+            return self.send(chat_id, message, homework, tenant)
+        lane = ALERT if homework is None else STATUS
+        self.delivery.submit(chat_id, message, homework, tenant, lane=lane)
+        return message
+
+    def owns(self, name):
+        """Проверка, что реплика отвечает за опрос арендатора."""
+        return self.leaser is None or self.leaser.owns(name)
+
+    def load_cursors(self, shards):
+        """Загрузка курсоров from_date арендаторов захваченных шардов.
+
+        Опрос продолжается с курсора предыдущего владельца шарда.
+        """
+        names = [
+            name for name in self.tenants
+            if shard_of(name, self.leaser.shards) in shards
+        ]
+        try:
+            cursors = self.leaser.store.load_cursors(names)
+        except Exception as error:
+            logger.error(f'Ошибка загрузки курсоров: {error}')
+            return
+        self.timestamps.update(cursors)
+
+    def save_cursor(self, name):
+        """Сохранение курсора from_date арендатора для других реплик."""
+        try:
+            self.leaser.store.save_cursor(name, self.timestamps[name])
+        except Exception as error:
+            logger.error(f'{name}: ошибка сохранения курсора: {error}')
+
+    def fetch_stage(self, tenant):
+        """Стадия запроса статусов арендатора к API.
+
+        При заданном limiter число одновременных HTTP-запросов
+        подстраивается под их задержку и ошибки API. Арендатор,
+        шард которого реплика потеряла после постановки в конвейер,
+        не опрашивается.
+        """
+        if not self.owns(tenant.name):
+            return []
+        response = fetch_statuses(
+            self.timestamps[tenant.name], tenant.headers, tenant.name,
+            self.limiter
+        )
+        return [(tenant, response)]
+
+    def check_stage(self, item):
+        """Стадия проверки ответа и отбора реальных переходов статуса.
+
+        Если шард арендатора перешёл к другой реплике во время запроса,
+        ответ отбрасывается: уведомления отправит новый владелец.
+        """
+        tenant, response = item
+        if not self.owns(tenant.name):
+            return []
+        try:
+            self.timestamps[tenant.name] = response['current_date']
+        except KeyError:
+            raise KeyError('В ответе API отсутствует временная метка')
+        if self.leaser is not None:
+            self.save_cursor(tenant.name)
+        homeworks = check_homeworks(response)
+        self.last_errors.pop(tenant.name, None)
+        changed = [
+            homework for homework in homeworks
+            if self.transitions.is_transition(homework, tenant.name)
+        ]
+        for homework in changed:
+            record_transition(tenant.name, homework)
+        return [(tenant, homework) for homework in changed]
+
+    def render_stage(self, item):
+        """Стадия формирования сообщения.
+
+        Сообщение формируется один раз, передаётся в дополнительные
+        каналы и адресуется во все чаты, подписанные на арендатора.
+        """
+        tenant, homework = item
+        message = parse_status(homework)
+        self.publish(tenant.chat_id, message)
+        return [
+            (tenant, chat_id, message, homework)
+            for chat_id in self.subscriptions.chats_for(tenant)
+        ]
+
+    def deliver_stage(self, item):
+        """Стадия отправки сообщения в чат."""
+        tenant, chat_id, message, homework = item
+        self.notify(chat_id, message, homework, tenant.name)
+
+    def poll(self, tenant):
+        """Опрос API для одного арендатора и отправка уведомлений.
+
+        Стадии конвейера выполняются последовательно в текущем потоке.
+        """
+        for fetched in self.fetch_stage(tenant):
+            for checked in self.check_stage(fetched):
+                for rendered in self.render_stage(checked):
+                    self.deliver_stage(rendered)
+
+    def handle_error(self, tenant, error):
+        """Уведомление арендатора о сбое опроса.
+
+        Повторяющееся сообщение об ошибке арендатору не отправляется.
+        При ограничении частоты запросов арендатор не уведомляется,
+        а возвращается задержка до повторного опроса. При постоянной
+        ошибке (например, отозванном токене) опрос арендатора отключается.
+        """
+        if isinstance(error, RateLimitException):
+            logger.warning(f'{tenant.name}: {error}')
+            return error.retry_after
+        if getattr(error, 'fatal', False):
+            self.disable(tenant, error)
+            return None
+        message = f'Сбой в работе программы: {error}'
+        logger.error(f'{tenant.name}: {message}')
+        if self.last_errors.get(tenant.name) != message:
+            self.publish(tenant.chat_id, message)
+            self.last_errors[tenant.name] = self.notify(
+                tenant.chat_id, message
+            )
+        return None
+
+    def disable(self, tenant, error):
+        """Отключение опроса арендатора с единственным уведомлением."""
+        with self._lock:
+            self.scheduler.remove(tenant.name)
+            self.disabled[tenant.name] = str(error)
+        message = f'Опрос остановлен из-за постоянной ошибки: {error}'
+        logger.critical(f'{tenant.name}: {message}')
+        self.publish(tenant.chat_id, message)
+        self.notify(tenant.chat_id, message)
+
+    def enable(self, name):
+        """Возобновление опроса отключённого арендатора."""
+        with self._lock:
+            if self.disabled.pop(name, None) is not None:
+                self.scheduler.schedule(name, self.clock())
+
+    def poll_safely(self, tenant):
+        """Опрос арендатора с обработкой сбоя."""
+        try:
+            self.poll(tenant)
+        except Exception as error:
+            return self.handle_error(tenant, error)
+
+    def stage_failed(self, stage, item, error):
+        """Обработка сбоя на стадии конвейера."""
+        tenant = item[0] if isinstance(item, tuple) else item
+        retry_after = self.handle_error(tenant, error)
+        if retry_after is not None:
+            self.retry_later(tenant.name, retry_after)
+
+    def retry_later(self, name, delay):
+        """Перенос опроса арендатора на delay секунд от текущего момента."""
+        with self._lock:
+            self.scheduler.schedule(name, self.clock() + delay)
+
+    def build_pipeline(self, fetch=1, check=1, render=1, deliver=1,
+                       maxsize=100):
+        """Запуск конвейера fetch → check → render → deliver.
+
+        Стадия deliver распределяет сообщения между потоками по ID чата,
+        поэтому сообщения в один чат отправляются по порядку. Потоки
+        стадий отслеживаются сторожем watchdog, если он запущен.
+        """
+        self.pipeline = Pipeline([
+            Stage('fetch', self.fetch_stage, fetch, maxsize),
+            Stage('check', self.check_stage, check, maxsize),
+            Stage('render', self.render_stage, render, maxsize),
+            Stage('deliver', self.deliver_stage, deliver, maxsize,
+                  key=lambda item: item[1]),
+        ], on_error=self.stage_failed, watchdog=self.watchdog)
+        return self.pipeline
+
+    def run_once(self):
+        """Опрос арендаторов, срок которых наступил.
+
+        Следующий срок отсчитывается от предыдущего, а не от времени
+        опроса, поэтому распределение по периоду сохраняется.
+        Арендатор, опрос которого упёрся в ограничение частоты,
+        опрашивается повторно после Retry-After. Арендаторы из шардов,
+        которыми реплика не владеет, пропускаются; для захваченных шардов
+        загружаются курсоры from_date предыдущего владельца.
+        При запущенном конвейере арендаторы передаются в него, и опрос
+        завершается асинхронно.
+        """
+        now = self.clock()
+        if self.leaser is not None:
+            self.leaser.refresh_if_due()
+            acquired = self.leaser.take_acquired()
+            if acquired:
+                self.load_cursors(acquired)
+        with self._lock:
+            due = self.scheduler.pop_due(now)
+            for name, deadline in due:
+                self.scheduler.schedule(name, max(deadline + self.period, now))
+        for name, _ in due:
+            tenant = self.tenants[name]
+            if not self.owns(name):
+                continue
+            if self.pipeline is not None:
+                self.pipeline.submit(tenant)
+            else:
+                retry_after = self.poll_safely(tenant)
+                if retry_after is not None:
+                    self.retry_later(name, retry_after)
+        return len(due)
+
+    def restore(self, state):
+        """Восстановление расписания после перезапуска.
+
+        state — словарь {арендатор: (время следующего опроса по часам
+        системы, from_date, причина отключения или None)}. Будущие сроки
+        сохраняются. Просроченные за время простоя опросы распределяются
+        по доле периода, равной их доле среди арендаторов, то есть
+        с обычной частотой, начиная с самых старых. Отключённые
+        арендаторы остаются отключёнными без повторного уведомления.
+        Арендаторы без сохранённого состояния распределяются по всему
+        периоду.
+        """
+        now = self.clock()
+        wall = time.time()
+        overdue = []
+        fresh = []
+        with self._lock:
+            for name in self.tenants:
+                if name not in state:
+                    fresh.append(name)
+                    continue
+                next_poll, from_date, disabled = state[name]
+                if from_date is not None:
+                    self.timestamps[name] = from_date
+                if disabled is not None:
+                    self.scheduler.remove(name)
+                    self.disabled[name] = disabled
+                elif next_poll >= wall:
+                    self.scheduler.schedule(
+                        name, now + min(next_poll - wall, self.period)
+                    )
+                else:
+                    overdue.append((next_poll, name))
+            overdue.sort()
+            self.scheduler.spread(
+                [name for _, name in overdue],
+                self.period * len(overdue) / max(1, len(self.tenants)), now
+            )
+            self.scheduler.spread(fresh, self.period, now)
+        logger.info(
+            f'Расписание восстановлено: {len(self.tenants) - len(fresh)} '
+            f'арендаторов, из них просрочено {len(overdue)}, '
+            f'отключено {len(self.disabled)}, новых {len(fresh)}'
+        )
+
+    def save_state(self):
+        """Сохранение расписания, from_date и отключённых арендаторов."""
+        now = self.clock()
+        wall = time.time()
+        with self._lock:
+            rows = [
+                (name, wall + deadline - now, self.timestamps.get(name),
+                 None)
+                for name, deadline in self.scheduler.items()
+            ]
+            rows.extend(
+                (name, wall, self.timestamps.get(name), reason)
+                for name, reason in self.disabled.items()
+            )
+        self.state_store.save(rows)
+        self.state_saved = now
+
+    def save_state_if_due(self):
+        """Сохранение расписания раз в STATE_SAVE_INTERVAL секунд."""
+        if self.state_store is None:
+            return
+        if self.clock() - self.state_saved >= STATE_SAVE_INTERVAL:
+            self.save_state()
+
+    def run_forever(self, sleep=time.sleep):
+        """Бесконечный цикл опроса.
+
+        При аренде шардов цикл просыпается не реже раза в треть
+        срока аренды, чтобы вовремя её продлевать. При заданном
+        state_store расписание периодически сохраняется, а при остановке
+        цикла выполняется shutdown().
+        """
+        longest_sleep = self.period
+        if self.leaser is not None:
+            longest_sleep = min(self.period, self.leaser.ttl / 3)
+        try:
+            while True:
+                if self.watchdog is not None:
+                    self.watchdog.beat('engine')
+                self.run_once()
+                self.save_state_if_due()
+                if self.watchdog is not None:
+                    self.watchdog.idle('engine')
+                next_deadline = self.scheduler.next_deadline()
+                if next_deadline is None:
+                    sleep(longest_sleep)
+                else:
+                    sleep(min(
+                        longest_sleep, max(0, next_deadline - self.clock())
+                    ))
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Сохранение расписания и освобождение аренд при остановке.
+
+        Шарды освобождаются сразу, и другие реплики забирают их,
+        не дожидаясь истечения аренды.
+        """
+        if self.state_store is not None:
+            self.save_state()
+        if self.leaser is not None:
+            self.leaser.release_all()
+
+
+def build_bot():
+    """Бот Telegram или пул ботов, если задан TELEGRAM_TOKENS."""
+    if not TELEGRAM_TOKENS:
+        return TeleBot(TELEGRAM_TOKEN)
+    return BotPool(
+        [TeleBot(token.strip()) for token in TELEGRAM_TOKENS.split(',')],
+        TELEGRAM_RPS
+    )
+
+
+def build_notifier():
+    """Дополнительные каналы доставки из переменных окружения.
+
+    Число попыток и начальная задержка повторов задаются для каждого
+    канала отдельно. Возвращается None, если ни один канал не настроен.
+    """
+    workers = []
+    if WEBHOOK_URL:
+        workers.append(SinkWorker(
+            WebhookSink(WEBHOOK_URL),
+            RetryPolicy(WEBHOOK_RETRY_ATTEMPTS, WEBHOOK_RETRY_DELAY)
+        ))
+    if SMTP_HOST:
+        workers.append(SinkWorker(
+            SmtpSink(
+                SMTP_HOST, SMTP_PORT, SMTP_SENDER, SMTP_RECIPIENTS.split(','),
+                load_smtp_routes(SMTP_ROUTES_FILE) if SMTP_ROUTES_FILE
+                else None
+            ),
+            RetryPolicy(SMTP_RETRY_ATTEMPTS, SMTP_RETRY_DELAY)
+        ))
+    return Notifier(workers) if workers else None
+
+
+def main():
+    """Запуск опроса арендаторов."""
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s [%(levelname)s] %(message)s'
+    )
+    if TENANTS_DB:
+        tenants = TenantRegistry(TENANTS_DB).load()
+    elif TENANTS_FILE:
+        tenants = load_tenants(TENANTS_FILE)
+    else:
+        check_tokens()
+        tenants = [
+            Tenant(DEFAULT_TENANT, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+        ]
+    bot = instrument_bot(build_bot())
+    engine = Engine(bot, tenants, delivery_workers=DELIVERY_WORKERS)
+    engine.watchdog = start_watchdog('engine')
+    start_memory_guard()
+    engine.notifier = build_notifier()
+    if PIPELINE_WORKERS:
+        engine.build_pipeline(*map(int, PIPELINE_WORKERS.split(',')))
+    if FETCH_CONCURRENCY:
+        engine.limiter = AdaptiveLimiter(max_limit=FETCH_CONCURRENCY)
+    if EDIT_MESSAGES:
+        engine.message_ids = MessageIds()
+    if SUBSCRIPTIONS_FILE:
+        engine.subscriptions = load_subscriptions(SUBSCRIPTIONS_FILE)
+    if STATE_DB:
+        engine.state_store = ScheduleStore(STATE_DB)
+        engine.restore(engine.state_store.load())
+    if LEASE_DB:
+        engine.leaser = ShardLeaser(
+            SQLiteLeaseStore(LEASE_DB), REPLICA_ID, LEASE_SHARDS, LEASE_TTL
+        )
+    engine.run_forever()
+
+
+if __name__ == '__main__':
+    main()
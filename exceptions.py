@@ -3,8 +3,20 @@
 
 Исключения для обработки следующих исключений:
 1. Не созданы переменные окружения для работы проекта;
-2. Проблемы с доступностью эндопоинта.
+2. Проблемы с доступностью эндопоинта;
+3. Превышение ограничения частоты запросов к эндпоинту.
+
+Ошибки эндпоинта делятся на временные (retryable: сбой соединения,
+таймаут, 408 и ответы 5xx), которые имеет смысл сразу повторить,
+и постоянные (fatal: 401, 403, 404), при которых опрос бессмыслен
+до вмешательства человека.
 """
+from http import HTTPStatus
+
+RETRYABLE_CODES = (HTTPStatus.REQUEST_TIMEOUT,)
+FATAL_CODES = (
+    HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN, HTTPStatus.NOT_FOUND
+)
 
 
 class EmptyValueException(Exception):
@@ -32,3 +44,38 @@ class EndpointException(Exception):
             )
         else:
             return f'Ошибка при обращении к эндпоинту {self.endpoint}.'
+
+    @property
+    def retryable(self):
+        """Временная ошибка, запрос можно сразу повторить."""
+        return (
+            self.code is None or self.code in RETRYABLE_CODES
+            or self.code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+
+    @property
+    def fatal(self):
+        """Постоянная ошибка, повторять запрос бессмысленно."""
+        return self.code in FATAL_CODES
+
+
+class RateLimitException(EndpointException):
+    """Исключение для ответов 429 и 503 с ограничением частоты.
+
+    Немедленный повтор только продлит ограничение, поэтому ошибка
+    не считается временной: запрос повторяется после Retry-After.
+    """
+
+    retryable = False
+
+    def __init__(self, endpoint=None, code=None, retry_after=None):
+        super().__init__(endpoint=endpoint, code=code)
+        self.retry_after = retry_after
+
+    def __str__(self):
+        if self.retry_after is None:
+            return super().__str__()
+        return (
+            f'{super().__str__()}. '
+            f'Повторный запрос через {self.retry_after:.0f} с.'
+        )
@@ -0,0 +1,129 @@
+"""
+Хеджирование запросов к API Я.Практикум.
+
+Если первый запрос не ответил за время, равное текущему p95 задержки,
+отправляется второй такой же запрос. Используется ответ, пришедший первым,
+второй запрос отменяется. Доля хеджированных запросов ограничена бюджетом.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Скользящее окно задержек для расчёта перцентиля."""
+
+    def __init__(self, window=200, quantile=0.95, default=1.0,
+                 min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.quantile = quantile
+        self.default = default
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Добавление измеренной задержки в окно."""
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self):
+        """Текущее значение перцентиля.
+
+        Используется метод ближайшего ранга: наименьший замер, не меньше
+        которого доля quantile всех замеров. Пока замеров недостаточно,
+        возвращается значение по умолчанию.
+        """
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return self.default
+            ordered = sorted(self.samples)
+        position = max(0, math.ceil(len(ordered) * self.quantile) - 1)
+        return ordered[position]
+
+
+class HedgeBudget:
+    """Ограничение доли хеджированных запросов от общего трафика."""
+
+    def __init__(self, ratio=0.05, burst=1):
+        self.ratio = ratio
+        self.burst = burst
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        """Учёт основного запроса."""
+        with self._lock:
+            self.requests += 1
+
+    def try_acquire(self):
+        """Попытка потратить бюджет на дополнительный запрос."""
+        with self._lock:
+            if self.hedges + 1 > self.requests * self.ratio + self.burst:
+                return False
+            self.hedges += 1
+            return True
+
+
+class Hedger:
+    """Выполнение запросов с хеджированием по p95 задержки."""
+
+    def __init__(self, tracker=None, budget=None, max_workers=8):
+        self.tracker = tracker or LatencyTracker()
+        self.budget = budget or HedgeBudget()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='hedge'
+        )
+
+    def _timed(self, request):
+        started = time.monotonic()
+        result = request()
+        self.tracker.observe(time.monotonic() - started)
+        return result
+
+    def call(self, request):
+        """Выполнение запроса с возможной отправкой второго.
+
+        Возвращается первый успешный ответ; если оба запроса завершились
+        ошибкой, пробрасывается исключение первого завершившегося.
+        """
+        self.budget.record_request()
+        primary = self.executor.submit(self._timed, request)
+        done, _ = wait([primary], timeout=self.tracker.percentile())
+        if done or not self.budget.try_acquire():
+            return primary.result()
+        logger.debug('Запрос не ответил за p95, отправлен повторный запрос')
+        pending = {primary, self.executor.submit(self._timed, request)}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        cancel(other)
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+
+def cancel(future):
+    """Отмена проигравшего запроса.
+
+    Если запрос уже выполняется, его ответ будет закрыт по завершении,
+    чтобы соединение вернулось в пул.
+    """
+    if future.cancel():
+        return
+
+    def close_response(finished):
+        if not finished.cancelled() and finished.exception() is None:
+            close = getattr(finished.result(), 'close', None)
+            if close is not None:
+                close()
+
+    future.add_done_callback(close_response)
@@ -0,0 +1,215 @@
+"""
+История переходов статусов домашних работ.
+
+Переходы, замеченные ботом, сохраняются в SQLite с индексами
+по арендатору, работе, уроку и дате обновления. Запись выполняется
+пачками в фоновом потоке, поэтому цикл опроса только добавляет
+переход в буфер.
+
+Отчёт о времени проверки по урокам:
+
+    python history.py report --db history.db [--lesson НАЗВАНИЕ]
+"""
+import argparse
+import atexit
+import logging
+import math
+import sqlite3
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from records import parse_date
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS transitions ('
+    'tenant TEXT NOT NULL, homework_id INTEGER, homework_name TEXT, '
+    'lesson_name TEXT, status TEXT NOT NULL, date_updated TEXT, '
+    'seen_at REAL NOT NULL)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS transitions_unique '
+    'ON transitions (tenant, homework_name, status, '
+    "COALESCE(date_updated, ''))",
+    'CREATE INDEX IF NOT EXISTS transitions_tenant '
+    'ON transitions (tenant, date_updated)',
+    'CREATE INDEX IF NOT EXISTS transitions_homework '
+    'ON transitions (homework_id, date_updated)',
+    'CREATE INDEX IF NOT EXISTS transitions_lesson '
+    'ON transitions (lesson_name, date_updated)',
+)
+VERDICTS = ('approved', 'rejected')
+
+
+class HistoryStore:
+    """Хранилище переходов статусов в SQLite.
+
+    Уникальность переходов проверяется индексом с COALESCE:
+    в UNIQUE-ограничении SQLite считает значения NULL различными,
+    и переходы без date_updated дублировались бы.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def insert_many(self, rows):
+        """Сохранение пачки переходов одной транзакцией.
+
+        Строка: (арендатор, запись HomeworkRecord, время обнаружения).
+        Повторно замеченные переходы игнорируются.
+        """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO transitions (tenant, homework_id, '
+                'homework_name, lesson_name, status, date_updated, seen_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (tenant, record.id, record.name, record.lesson_name,
+                     record.status.value, record.date_updated, seen_at)
+                    for tenant, record, seen_at in rows
+                ]
+            )
+
+    def transitions(self, tenant=None, homework_id=None, lesson=None,
+                    since=None):
+        """Переходы с фильтрами, упорядоченные по дате обновления."""
+        conditions = []
+        params = []
+        for column, value in (
+            ('tenant = ?', tenant), ('homework_id = ?', homework_id),
+            ('lesson_name = ?', lesson), ('date_updated >= ?', since),
+        ):
+            if value is not None:
+                conditions.append(column)
+                params.append(value)
+        where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+        with self._lock:
+            return self.connection.execute(
+                'SELECT tenant, homework_id, homework_name, lesson_name, '
+                f'status, date_updated FROM transitions {where}'
+                'ORDER BY date_updated', params
+            ).fetchall()
+
+    def turnaround(self, lesson=None):
+        """Время проверки по урокам в секундах.
+
+        Время проверки — интервал от перехода в reviewing до ближайшего
+        следующего вердикта (approved или rejected) той же работы.
+        Возвращается словарь {урок: список интервалов}.
+        """
+        started = {}
+        durations = defaultdict(list)
+        for tenant, _, name, lesson_name, status, date_updated in (
+            self.transitions(lesson=lesson)
+        ):
+            if date_updated is None:
+                continue
+            key = (tenant, name)
+            if status == 'reviewing':
+                started[key] = parse_date(date_updated)
+            elif status in VERDICTS and key in started:
+                review = parse_date(date_updated) - started.pop(key)
+                durations[lesson_name].append(review.total_seconds())
+        return dict(durations)
+
+    def close(self):
+        """Закрытие соединения."""
+        self.connection.close()
+
+
+class BatchWriter:
+    """Буферизованная запись переходов пачками.
+
+    Пачка записывается, когда в буфере batch_size переходов
+    или с прошлой записи прошло interval секунд. Остаток буфера
+    записывается при завершении процесса.
+    """
+
+    def __init__(self, store, batch_size=500, interval=5.0):
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+        self.buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, name='history', daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.close)
+
+    def add(self, tenant, record):
+        """Добавление перехода в буфер."""
+        with self._lock:
+            self.buffer.append((tenant, record, time.time()))
+            full = len(self.buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Запись накопленных переходов."""
+        with self._lock:
+            rows, self.buffer = self.buffer, []
+        if rows:
+            try:
+                self.store.insert_many(rows)
+            except sqlite3.Error as error:
+                logger.error(f'Ошибка записи истории переходов: {error}')
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """Запись остатка буфера и остановка потока."""
+        self._stop.set()
+        self._wakeup.set()
+        self.thread.join()
+        self.flush()
+
+
+def report(store, lesson=None):
+    """Строки отчёта о времени проверки по урокам.
+
+    p90 считается методом ближайшего ранга.
+    """
+    lines = [f'{"Урок":<40} {"Работ":>6} {"Медиана, ч":>11} {"p90, ч":>8}']
+    for lesson_name, durations in sorted(
+        store.turnaround(lesson).items(), key=lambda item: str(item[0])
+    ):
+        ordered = sorted(durations)
+        p90 = ordered[max(0, math.ceil(len(ordered) * 0.9) - 1)]
+        lines.append(
+            f'{str(lesson_name):<40} {len(ordered):>6} '
+            f'{statistics.median(ordered) / 3600:>11.1f} {p90 / 3600:>8.1f}'
+        )
+    return lines
+
+
+def main(argv=None):
+    """Командная строка для отчётов по истории."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    report_parser = commands.add_parser(
+        'report', help='время проверки по урокам'
+    )
+    report_parser.add_argument('--db', required=True)
+    report_parser.add_argument('--lesson')
+    args = parser.parse_args(argv)
+    store = HistoryStore(args.db)
+    try:
+        print('\n'.join(report(store, args.lesson)))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
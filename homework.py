@@ -3,8 +3,24 @@ import os
 import requests
 import time
 
+from decoding import decode_json
 from dotenv import load_dotenv
-from exceptions import EndpointException, EmptyValueException
+from exceptions import (
+    EndpointException, EmptyValueException, RateLimitException
+)
+from hedging import HedgeBudget, Hedger
+from history import BatchWriter, HistoryStore
+from liveness import Watchdog
+from memory import MemoryGuard
+from metrics import registry
+from ratelimit import TokenBucket, parse_retry_after
+from recording import Recorder, Replay
+from records import HomeworkRecord
+from retry import EndpointRetryPolicy
+from slo import SloTracker
+from transitions import TransitionIndex
+from transport import ACCEPT_ENCODING, account
+from validation import HomeworkValidator, Quarantine
 from http import HTTPStatus
 from telebot import TeleBot, apihelper
 
@@ -17,6 +33,29 @@ TELEGRAM_CHAT_ID = os.getenv('CHAT_ID')
 RETRY_PERIOD = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+HEDGE_REQUESTS = os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true'
+HEDGE_BUDGET = float(os.getenv('HEDGE_BUDGET', 0.05))
+QUARANTINE_FILE = os.getenv('QUARANTINE_FILE')
+HISTORY_DB = os.getenv('HISTORY_DB')
+DEFAULT_TENANT = 'default'
+RECORD_FILE = os.getenv('RECORD_FILE')
+REPLAY_FILE = os.getenv('REPLAY_FILE')
+REPLAY_SPEED = float(os.getenv('REPLAY_SPEED', 1))
+PRACTICUM_RPS = float(os.getenv('PRACTICUM_RPS', 5))
+PRACTICUM_BURST = int(os.getenv('PRACTICUM_BURST', 10))
+RATE_LIMIT_BACKOFF = 60
+RATE_LIMIT_CODES = (
+    HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE
+)
+FETCH_ATTEMPTS = int(os.getenv('FETCH_ATTEMPTS', 3))
+FETCH_RETRY_DELAY = float(os.getenv('FETCH_RETRY_DELAY', 0.1))
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', 30))
+MEMORY_GUARD_INTERVAL = int(os.getenv('MEMORY_GUARD_INTERVAL', 0))
+WATCHDOG_DEADLINE = int(os.getenv('WATCHDOG_DEADLINE', 0))
+WATCHDOG_PORT = int(os.getenv('WATCHDOG_PORT', 0)) or None
+WATCHDOG_EXIT = os.getenv('WATCHDOG_EXIT', 'false').lower() == 'true'
+SLO_TARGET = int(os.getenv('SLO_TARGET', 900))
+SLO_OBJECTIVE = float(os.getenv('SLO_OBJECTIVE', 0.95))
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -25,6 +64,15 @@ HOMEWORK_VERDICTS = {
 }
 
 logger = logging.getLogger(__name__)
+hedger = Hedger(budget=HedgeBudget(HEDGE_BUDGET)) if HEDGE_REQUESTS else None
+validator = HomeworkValidator(HOMEWORK_VERDICTS)
+quarantine = Quarantine(QUARANTINE_FILE)
+recorder = Recorder(RECORD_FILE) if RECORD_FILE else None
+replay = Replay(REPLAY_FILE, REPLAY_SPEED) if REPLAY_FILE else None
+practicum_bucket = TokenBucket(PRACTICUM_RPS, PRACTICUM_BURST)
+fetch_retry = EndpointRetryPolicy(FETCH_ATTEMPTS, FETCH_RETRY_DELAY)
+history = BatchWriter(HistoryStore(HISTORY_DB)) if HISTORY_DB else None
+slo = SloTracker(SLO_TARGET, SLO_OBJECTIVE)
 
 
 def check_tokens():
@@ -49,14 +97,14 @@ def check_tokens():
         raise EmptyValueException(empty_value)
 
 
-def send_message(bot, message):
-    """Отправка сообщения пользователю.
+def deliver(bot, chat_id, message):
+    """Отправка сообщения в указанный чат.
 
     Отправка сообщений пользователю, логгируются
     действия успешной и неуспешной отправки.
     """
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        bot.send_message(chat_id=chat_id, text=message)
     except apihelper.ApiException as error:
         logger.error(f'Ошибка при отправке сообщения: {error}')
     else:
@@ -64,39 +112,164 @@ def send_message(bot, message):
         return message
 
 
-def get_api_answer(timestamp):
-    """Запрос к эндпоинту API.
+def edit_or_deliver(bot, chat_id, message, message_id=None):
+    """Изменение ранее отправленного сообщения или отправка нового.
+
+    Если изменить сообщение message_id не удалось, отправляется новое.
+    Возвращается пара: признак доставки и ID сообщения с текстом message.
+    """
+    if message_id is not None:
+        try:
+            bot.edit_message_text(
+                message, chat_id=chat_id, message_id=message_id
+            )
+        except apihelper.ApiException as error:
+            if 'message is not modified' in str(error):
+                return True, message_id
+            logger.warning(
+                f'Не удалось изменить сообщение {message_id}: {error}'
+            )
+        else:
+            logger.debug(f'Бот изменил сообщение: "{message}"')
+            return True, message_id
+    try:
+        sent = bot.send_message(chat_id=chat_id, text=message)
+    except apihelper.ApiException as error:
+        logger.error(f'Ошибка при отправке сообщения: {error}')
+        return False, None
+    logger.debug(f'Бот отправил сообщение: "{message}"')
+    return True, getattr(sent, 'message_id', None)
+
+
+def send_message(bot, message):
+    """Отправка сообщения пользователю.
+
+    Сообщение отправляется в чат TELEGRAM_CHAT_ID.
+    """
+    return deliver(bot, TELEGRAM_CHAT_ID, message)
+
+
+def http_get(url, **kwargs):
+    """GET-запрос к API.
+
+    При заданном REPLAY_FILE ответ берётся из записи,
+    при заданном RECORD_FILE запрос и ответ записываются.
+    """
+    if replay is not None:
+        return replay.get(url, **kwargs)
+    if recorder is not None:
+        return recorder.get(requests.get, url, **kwargs)
+    return requests.get(url, **kwargs)
+
+
+def instrument_bot(bot):
+    """Подмена или обёртка бота для записи и воспроизведения трафика."""
+    if replay is not None:
+        return replay.bot()
+    if recorder is not None:
+        return recorder.wrap_bot(bot)
+    return bot
+
+
+def fetch_statuses(timestamp, headers, tenant=DEFAULT_TENANT, limiter=None):
+    """Запрос статусов домашних работ с повтором временных ошибок.
+
+    Сбои соединения и ответы 5xx повторяются в том же цикле опроса
+    до FETCH_ATTEMPTS раз с экспоненциальной задержкой и разбросом,
+    остальные ошибки пробрасываются сразу.
+    """
+    return fetch_retry.call(
+        request_statuses, timestamp, headers, tenant, limiter
+    )
+
+
+def request_statuses(timestamp, headers, tenant=DEFAULT_TENANT,
+                     limiter=None):
+    """Запрос статусов домашних работ с указанными заголовками.
 
     Проверка доступности эндпоинта и его ответа в случае его доступности.
+    При включённом HEDGE_REQUESTS медленный запрос дублируется.
+    Запросы расходуют общий бюджет practicum_bucket, а ответы 429 и 503
+    приостанавливают все запросы на время из заголовка Retry-After.
+    Ответ запрашивается сжатым, трафик учитывается по арендатору tenant.
+    Запрос, не получивший ответа за REQUEST_TIMEOUT секунд, считается
+    временной ошибкой эндпоинта. При заданном limiter (AdaptiveLimiter)
+    через него проходит только сам HTTP-запрос, уже после ожидания
+    practicum_bucket.
     """
     payloads = {'from_date': timestamp}
+    headers = {**headers, 'Accept-Encoding': ACCEPT_ENCODING}
+
+    def request():
+        practicum_bucket.acquire()
+        kwargs = dict(
+            headers=headers, params=payloads, timeout=REQUEST_TIMEOUT
+        )
+        if limiter is None:
+            response = http_get(ENDPOINT, **kwargs)
+        else:
+            response = limiter.call(http_get, ENDPOINT, **kwargs)
+        account(tenant, ENDPOINT, headers, payloads, response)
+        return response
+
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=payloads)
+        if hedger is None:
+            response = request()
+        else:
+            response = hedger.call(request)
     except requests.exceptions.RequestException:
         raise EndpointException(endpoint=ENDPOINT)
     status_code = response.status_code
+    if status_code in RATE_LIMIT_CODES:
+        response_headers = getattr(response, 'headers', None) or {}
+        retry_after = parse_retry_after(
+            response_headers.get('Retry-After'), RATE_LIMIT_BACKOFF
+        )
+        practicum_bucket.pause(retry_after)
+        registry.increment('practicum_rate_limited', code=status_code)
+        raise RateLimitException(ENDPOINT, status_code, retry_after)
     if status_code != HTTPStatus.OK:
         raise EndpointException(endpoint=ENDPOINT, code=status_code)
-    return response.json()
+    return decode_json(response)
 
 
-def check_response(response):
-    """Проверка полученного ответа от API.
+def get_api_answer(timestamp):
+    """Запрос к эндпоинту API.
 
-    Проверка, что в ответе домашнее задание хранится в списке,
-    извлечение данных о домашке и текущего времени, для обновления.
+    Запрос выполняется с токеном PRACTICUM_TOKEN.
+    """
+    return fetch_statuses(timestamp, HEADERS)
+
+
+def check_homeworks(response):
+    """Проверка ответа API и всех домашних работ в нём.
+
+    Проверка, что в ответе домашние задания хранятся в списке.
+    Корректные работы возвращаются списком записей HomeworkRecord,
+    некорректные помещаются в карантин и не прерывают обработку.
     """
     try:
-        homework = response['homeworks']
+        homeworks = response['homeworks']
     except KeyError as key:
         raise KeyError(f'В ответе API отсутствует ключ {key}')
-    if not isinstance(homework, list):
+    if not isinstance(homeworks, list):
         raise TypeError('Ответ с "homeworks" вернулся не в списке')
-    elif not homework:
+    records, rejected = validator.validate_many(homeworks)
+    quarantine.extend(rejected)
+    if not records:
         logger.debug('Нового статуса домашней работы нет')
-        return None
-    else:
-        return homework.pop()
+    return records
+
+
+def check_response(response):
+    """Проверка полученного ответа от API.
+
+    Проверка, что в ответе домашнее задание хранится в списке,
+    извлечение данных о последней корректной домашке
+    в виде компактной записи HomeworkRecord.
+    """
+    records = check_homeworks(response)
+    return records[-1] if records else None
 
 
 def parse_status(homework):
@@ -104,49 +277,123 @@ def parse_status(homework):
 
     Извлечение значений с названием домашней работы и её статусом,
     в случае если один из ключей недоступен, вызывается исключение.
+    Принимается как запись HomeworkRecord, так и словарь из ответа API.
     """
+    if not isinstance(homework, HomeworkRecord):
+        homework = HomeworkRecord.from_api(homework)
+    verdict = HOMEWORK_VERDICTS[homework.status.value]
+    return f'Изменился статус проверки работы "{homework.name}". {verdict}'
+
+
+def record_transition(tenant, homework):
+    """Сохранение перехода статуса в историю, если задан HISTORY_DB."""
+    if history is not None:
+        history.add(tenant, homework)
+
+
+def record_delivery(tenant, homework):
+    """Учёт задержки доставленного уведомления о статусе работы."""
+    slo.observe(tenant, homework.date_updated)
+
+
+def notify_status(bot, homework):
+    """Сохранение перехода статуса и уведомление о нём."""
+    record_transition(DEFAULT_TENANT, homework)
+    message = parse_status(homework)
+    if send_message(bot, message) is not None:
+        record_delivery(DEFAULT_TENANT, homework)
+
+
+def poll_once(bot, timestamp, transitions):
+    """Одна итерация опроса: запрос, проверка и уведомление о переходе.
+
+    Возвращается временная метка для следующего запроса.
+    """
+    response = get_api_answer(timestamp)
     try:
-        status = homework['status']
-        homework_name = homework['homework_name']
-    except KeyError as error:
-        message = f'Ключ {error} отсутствует в ответе от API'
-        raise KeyError(message)
-    try:
-        verdict = HOMEWORK_VERDICTS[status]
-    except KeyError as error:
-        message = f'Получен неожиданный статус домашней работы: {error}'
-        raise KeyError(message)
-    else:
-        return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+        timestamp = response['current_date']
+    except KeyError:
+        raise KeyError('В ответе API отсутствует временная метка')
+    homework = check_response(response)
+    if homework is not None and transitions.is_transition(homework):
+        notify_status(bot, homework)
+    return timestamp
 
 
-def main():
-    """Основная логика работы бота."""
-    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+def start_watchdog(engine='main'):
+    """Запуск сторожа цикла опроса.
+
+    Сторож запускается, только если задан WATCHDOG_DEADLINE,
+    иначе возвращается None. Срок первой итерации отсчитывается
+    от запуска. Цикл отмечает начало итерации и переход к ожиданию,
+    поэтому зависший запрос обнаруживается через WATCHDOG_DEADLINE
+    после начала итерации, а не после очередного RETRY_PERIOD.
+    """
+    if not WATCHDOG_DEADLINE:
+        return None
+    watchdog = Watchdog(WATCHDOG_DEADLINE, exit_on_stall=WATCHDOG_EXIT)
+    watchdog.beat(engine)
+    watchdog.start(WATCHDOG_PORT)
+    return watchdog
+
+
+def setup_logging():
+    """Вывод логов бота в stderr.
+
+    Обработчик добавляется один раз, повторные вызовы main()
+    не дублируют вывод и не накапливают обработчики.
+    """
     logger.setLevel(logging.DEBUG)
+    if logger.handlers:
+        return
     handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
+    handler.setFormatter(
+        logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+    )
     logger.addHandler(handler)
+
+
+def start_memory_guard():
+    """Запуск диагностики памяти, если задан MEMORY_GUARD_INTERVAL."""
+    if not MEMORY_GUARD_INTERVAL:
+        return None
+    return MemoryGuard(MEMORY_GUARD_INTERVAL).start()
+
+
+def main():
+    """Основная логика работы бота.
+
+    После постоянной ошибки (например, отозванного токена) опрос
+    прекращается, но процесс продолжает работать: при завершении
+    супервизор перезапускал бы его, и каждый перезапуск повторял бы
+    уведомление об ошибке.
+    """
+    setup_logging()
     check_tokens()
     bot = TeleBot(TELEGRAM_TOKEN)
+    bot = instrument_bot(bot)
     timestamp = int(time.time())
     last_send_message = None
+    transitions = TransitionIndex()
+    watchdog = start_watchdog()
+    start_memory_guard()
+    stopped = False
     while True:
+        if watchdog is not None:
+            watchdog.beat()
         try:
-            response = get_api_answer(timestamp)
-            try:
-                timestamp = response['current_date']
-            except KeyError:
-                raise KeyError('В ответе API отсутствует временная метка')
-            homework = check_response(response)
-            if homework is not None:
-                message = parse_status(homework)
-                send_message(bot, message)
+            if not stopped:
+                timestamp = poll_once(bot, timestamp, transitions)
         except Exception as error:
             message = f'Сбой в работе программы: {error}'
             logger.error(message)
             if last_send_message != message:
                 last_send_message = send_message(bot, message)
+            if getattr(error, 'fatal', False):
+                logger.critical('Опрос остановлен из-за постоянной ошибки')
+                stopped = True
+        if watchdog is not None:
+            watchdog.idle()
         time.sleep(RETRY_PERIOD)
 
 
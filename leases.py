@@ -0,0 +1,202 @@
+"""
+Аренда шардов арендаторов между репликами.
+
+Арендаторы распределяются по шардам, каждым шардом в любой момент
+владеет не более одной реплики. Владение подтверждается арендой (lease)
+с ограниченным сроком: реплика продлевает свои аренды, а шарды
+с истёкшей арендой забирают другие реплики.
+
+Вместе с арендами хранятся курсоры from_date арендаторов: владелец
+шарда сохраняет курсор после каждого опроса, а реплика, захватившая
+шард, продолжает опрос с него и не теряет уведомлений, полученных
+в API после последнего опроса предыдущего владельца.
+
+SQLiteLeaseStore подходит для реплик на одной машине; для общего
+хранилища достаточно реализовать методы LeaseStore.
+"""
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(key, shards):
+    """Номер шарда для ключа арендатора."""
+    return zlib.crc32(str(key).encode()) % shards
+
+
+class LeaseStore:
+    """Интерфейс хранилища аренд."""
+
+    def acquire(self, shard, owner, ttl):
+        """Получение или продление аренды шарда.
+
+        Возвращается True, если после вызова шардом владеет owner.
+        """
+        raise NotImplementedError
+
+    def release(self, shard, owner):
+        """Досрочное освобождение аренды шарда."""
+        raise NotImplementedError
+
+    def save_cursor(self, tenant, from_date):
+        """Сохранение курсора from_date арендатора."""
+        raise NotImplementedError
+
+    def load_cursors(self, tenants):
+        """Сохранённые курсоры арендаторов: {арендатор: from_date}."""
+        raise NotImplementedError
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Хранилище аренд в файле SQLite.
+
+    Захват выполняется одним оператором UPSERT: строка обновляется,
+    только если аренда принадлежит тому же владельцу или истекла.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS leases ('
+            'shard INTEGER PRIMARY KEY, owner TEXT NOT NULL, '
+            'expires REAL NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS cursors ('
+            'tenant TEXT PRIMARY KEY, from_date INTEGER NOT NULL)'
+        )
+
+    def acquire(self, shard, owner, ttl):
+        """Получение или продление аренды шарда."""
+        now = self.clock()
+        with self._lock:
+            self.connection.execute(
+                'INSERT INTO leases (shard, owner, expires) VALUES (?, ?, ?) '
+                'ON CONFLICT (shard) DO UPDATE SET '
+                'owner = excluded.owner, expires = excluded.expires '
+                'WHERE leases.owner = excluded.owner OR leases.expires < ?',
+                (shard, owner, now + ttl, now)
+            )
+            row = self.connection.execute(
+                'SELECT owner FROM leases WHERE shard = ?', (shard,)
+            ).fetchone()
+        return row is not None and row[0] == owner
+
+    def release(self, shard, owner):
+        """Досрочное освобождение аренды шарда."""
+        with self._lock:
+            self.connection.execute(
+                'DELETE FROM leases WHERE shard = ? AND owner = ?',
+                (shard, owner)
+            )
+
+    def save_cursor(self, tenant, from_date):
+        """Сохранение курсора from_date арендатора."""
+        with self._lock:
+            self.connection.execute(
+                'INSERT INTO cursors (tenant, from_date) VALUES (?, ?) '
+                'ON CONFLICT (tenant) DO UPDATE SET '
+                'from_date = excluded.from_date',
+                (tenant, from_date)
+            )
+
+    def load_cursors(self, tenants):
+        """Сохранённые курсоры арендаторов: {арендатор: from_date}."""
+        tenants = list(tenants)
+        if not tenants:
+            return {}
+        placeholders = ', '.join('?' * len(tenants))
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT tenant, from_date FROM cursors '
+                f'WHERE tenant IN ({placeholders})', tenants
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        """Закрытие соединения."""
+        self.connection.close()
+
+
+class ShardLeaser:
+    """Владение шардами одной реплики.
+
+    refresh() продлевает аренды и пытается захватить свободные шарды;
+    его нужно вызывать чаще, чем раз в ttl (например, раз в ttl / 3).
+    Захваченные с прошлого вызова take_acquired() шарды накапливаются
+    в acquired, чтобы загрузить курсоры их арендаторов.
+    """
+
+    def __init__(self, store, owner, shards, ttl=30, clock=time.monotonic):
+        self.store = store
+        self.owner = owner
+        self.shards = shards
+        self.ttl = ttl
+        self.clock = clock
+        self.owned = frozenset()
+        self.acquired = set()
+        self.refreshed = None
+
+    def refresh(self):
+        """Продление и захват аренд; возвращается множество шардов.
+
+        Время обновления фиксируется до обхода шардов: срок каждой
+        аренды в хранилище отсчитывается не раньше этого момента,
+        поэтому owns() не подтверждает владение дольше срока аренды,
+        сколько бы ни длился обход.
+        """
+        started = self.clock()
+        owned = set()
+        for shard in range(self.shards):
+            try:
+                if self.store.acquire(shard, self.owner, self.ttl):
+                    owned.add(shard)
+            except Exception as error:
+                logger.error(f'Ошибка аренды шарда {shard}: {error}')
+        if owned != self.owned:
+            logger.info(
+                f'Реплика {self.owner} владеет шардами {sorted(owned)}'
+            )
+        self.acquired |= owned - self.owned
+        self.owned = frozenset(owned)
+        self.refreshed = started
+        return self.owned
+
+    def refresh_if_due(self):
+        """Обновление аренд, если с прошлого прошло больше ttl / 3."""
+        if self.refreshed is None or (
+            self.clock() - self.refreshed >= self.ttl / 3
+        ):
+            self.refresh()
+        return self.owned
+
+    def owns(self, key):
+        """Проверка, что шард арендатора принадлежит реплике.
+
+        Если аренды не продлевались дольше ttl, они могли перейти
+        к другой реплике, поэтому владение не подтверждается.
+        """
+        if self.refreshed is None or (
+            self.clock() - self.refreshed >= self.ttl
+        ):
+            return False
+        return shard_of(key, self.shards) in self.owned
+
+    def take_acquired(self):
+        """Шарды, захваченные с прошлого вызова."""
+        acquired, self.acquired = self.acquired, set()
+        return acquired
+
+    def release_all(self):
+        """Освобождение всех аренд при остановке реплики."""
+        for shard in self.owned:
+            self.store.release(shard, self.owner)
+        self.owned = frozenset()
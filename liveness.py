@@ -0,0 +1,158 @@
+"""
+Контроль живости цикла опроса.
+
+Цикл опроса отмечает начало каждой итерации вызовом beat(), а переход
+к ожиданию следующей — вызовом idle(). Если итерация длится дольше
+deadline секунд, в лог выводятся стеки всех потоков, а при
+exit_on_stall процесс завершается, чтобы супервизор перезапустил
+воркер. Состояние доступно по HTTP: GET /health (200 или 503)
+и GET /metrics.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+def dump_stacks():
+    """Текстовый дамп стеков всех потоков процесса."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    blocks = []
+    for ident, frame in sys._current_frames().items():
+        stack = ''.join(traceback.format_stack(frame))
+        blocks.append(f'Поток {names.get(ident, ident)}:\n{stack}')
+    return '\n'.join(blocks)
+
+
+class Watchdog:
+    """Сторож, отслеживающий длительность текущих итераций циклов."""
+
+    def __init__(self, deadline, exit_on_stall=False, interval=None,
+                 clock=time.monotonic, metrics=registry):
+        self.deadline = deadline
+        self.exit_on_stall = exit_on_stall
+        self.interval = interval or max(1, deadline / 10)
+        self.clock = clock
+        self.metrics = metrics
+        self.beats = {}
+        self.idle_engines = set()
+        self.reported = set()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.server = None
+
+    def beat(self, engine='main'):
+        """Отметка о начале итерации цикла (или о ходе её выполнения)."""
+        with self._lock:
+            self.beats[engine] = self.clock()
+            self.idle_engines.discard(engine)
+            self.reported.discard(engine)
+
+    def idle(self, engine='main'):
+        """Отметка о завершении итерации и ожидании следующей.
+
+        Ожидающий цикл не считается зависшим, сколько бы оно ни длилось.
+        """
+        with self._lock:
+            self.beats[engine] = self.clock()
+            self.idle_engines.add(engine)
+            self.reported.discard(engine)
+
+    def ages(self):
+        """Время с последней отметки каждого цикла в секундах."""
+        now = self.clock()
+        with self._lock:
+            return {engine: now - last for engine, last in self.beats.items()}
+
+    def stalled(self):
+        """Циклы, итерация которых длится дольше срока."""
+        ages = self.ages()
+        with self._lock:
+            idle = set(self.idle_engines)
+        return {
+            engine: age for engine, age in ages.items()
+            if age > self.deadline and engine not in idle
+        }
+
+    def check(self):
+        """Проверка циклов и реакция на зависание.
+
+        Зависание учитывается в watchdog_stalls и выводится в лог
+        со стеками один раз — при переходе цикла в зависшее состояние.
+        """
+        stalled = self.stalled()
+        for engine, age in stalled.items():
+            with self._lock:
+                if engine in self.reported:
+                    continue
+                self.reported.add(engine)
+            self.metrics.increment('watchdog_stalls', engine=engine)
+            logger.critical(
+                f'Итерация цикла {engine} длится {age:.0f} с. '
+                f'Стеки потоков:\n{dump_stacks()}'
+            )
+        if stalled and self.exit_on_stall:
+            logger.critical('Процесс завершается для перезапуска')
+            logging.shutdown()
+            os._exit(1)
+        return stalled
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self, port=None, host='127.0.0.1'):
+        """Запуск потока проверки и, при заданном port, HTTP-сервера."""
+        threading.Thread(
+            target=self._run, name='watchdog', daemon=True
+        ).start()
+        if port is not None:
+            self.server = ThreadingHTTPServer((host, port), self._handler())
+            threading.Thread(
+                target=self.server.serve_forever,
+                name='watchdog-http', daemon=True
+            ).start()
+
+    def stop(self):
+        """Остановка потока проверки и HTTP-сервера."""
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def _handler(self):
+        watchdog = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path == '/health':
+                    stalled = watchdog.stalled()
+                    status = 503 if stalled else 200
+                    body = {
+                        'status': 'stalled' if stalled else 'ok',
+                        'engines': watchdog.ages(),
+                    }
+                elif self.path == '/metrics':
+                    status, body = 200, watchdog.metrics.snapshot()
+                else:
+                    status, body = 404, {'status': 'not found'}
+                payload = json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,105 @@
+"""
+Диагностика роста памяти.
+
+MemoryGuard периодически снимает снимки tracemalloc, сравнивает
+их с первым снимком и пишет в лог места с наибольшим ростом
+выделенной памяти. RSS процесса, объём и число блоков, выделенных
+Python, публикуются в метриках memory_rss_bytes,
+memory_traced_bytes и memory_traced_blocks.
+"""
+import logging
+import os
+import threading
+import tracemalloc
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+def rss_bytes():
+    """Текущий RSS процесса в байтах.
+
+    Если /proc недоступен, возвращается пиковый RSS из getrusage.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryGuard:
+    """Периодические снимки tracemalloc в фоновом потоке."""
+
+    def __init__(self, interval=600, top=10, frames=1, metrics=registry):
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.metrics = metrics
+        self.baseline = None
+        self._stop = threading.Event()
+        self.thread = None
+
+    def snapshot(self):
+        """Снимок tracemalloc без выделений самого модуля tracemalloc."""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def check(self):
+        """Снимок, публикация метрик и лог мест роста памяти.
+
+        Возвращается список статистик роста относительно первого
+        снимка, отсортированный по убыванию.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        snapshot = self.snapshot()
+        statistics = snapshot.statistics('lineno')
+        traced = sum(stat.size for stat in statistics)
+        self.metrics.set('memory_rss_bytes', rss_bytes())
+        self.metrics.set('memory_traced_bytes', traced)
+        self.metrics.set(
+            'memory_traced_blocks', sum(stat.count for stat in statistics)
+        )
+        if self.baseline is None:
+            self.baseline = snapshot
+            return []
+        growth = [
+            stat for stat in snapshot.compare_to(self.baseline, 'lineno')
+            if stat.size_diff > 0
+        ][:self.top]
+        if growth:
+            logger.info(
+                f'Рост памяти (всего {traced / 1024:.0f} КиБ):\n'
+                + '\n'.join(str(stat) for stat in growth)
+            )
+        return growth
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as error:
+                logger.error(f'Ошибка диагностики памяти: {error}')
+
+    def start(self):
+        """Запуск отслеживания выделений и фонового потока снимков."""
+        tracemalloc.start(self.frames)
+        self.check()
+        self.thread = threading.Thread(
+            target=self._run, name='memory', daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Остановка фонового потока и отслеживания выделений."""
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join()
+        tracemalloc.stop()
@@ -0,0 +1,38 @@
+"""
+ID отправленных сообщений о статусах домашних работ.
+
+Позволяет при следующем переходе статуса изменить уже отправленное
+сообщение вместо отправки нового.
+"""
+import threading
+from collections import OrderedDict
+
+
+class MessageIds:
+    """ID сообщений по паре (чат, домашняя работа).
+
+    Хранятся только целые ID, размер ограничен max_size:
+    вытесняются сообщения о работах, статус которых
+    дольше всего не менялся.
+    """
+
+    def __init__(self, max_size=100_000):
+        self.max_size = max_size
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self, chat_id, key):
+        """ID сообщения о работе key в чате chat_id или None."""
+        with self._lock:
+            return self._ids.get((chat_id, key))
+
+    def set(self, chat_id, key, message_id):
+        """Сохранение ID сообщения."""
+        with self._lock:
+            self._ids[(chat_id, key)] = int(message_id)
+            self._ids.move_to_end((chat_id, key))
+            if len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
@@ -0,0 +1,49 @@
+"""
+Метрики работы бота.
+
+Счётчики и показатели (gauges) с метками хранятся в памяти процесса
+и доступны одним снимком через snapshot().
+"""
+import threading
+
+
+def metric_name(name, labels):
+    """Имя метрики с метками в формате name{key="value"}."""
+    if not labels:
+        return name
+    rendered = ','.join(
+        f'{key}="{value}"' for key, value in sorted(labels.items())
+    )
+    return f'{name}{{{rendered}}}'
+
+
+class Metrics:
+    """Потокобезопасный реестр метрик."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        """Увеличение счётчика."""
+        key = metric_name(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Установка значения показателя."""
+        with self._lock:
+            self._values[metric_name(name, labels)] = value
+
+    def get(self, name, default=0, **labels):
+        """Текущее значение метрики."""
+        with self._lock:
+            return self._values.get(metric_name(name, labels), default)
+
+    def snapshot(self):
+        """Копия всех метрик."""
+        with self._lock:
+            return dict(self._values)
+
+
+registry = Metrics()
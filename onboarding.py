@@ -0,0 +1,121 @@
+"""
+Массовое подключение арендаторов.
+
+Арендаторы читаются из CSV-файла (столбцы name, practicum_token,
+chat_id), токены Я.Практикум и чаты Telegram проверяются параллельно
+ограниченным числом потоков, а прошедшие проверку арендаторы
+записываются в реестр одной транзакцией:
+
+    python onboarding.py tenants.csv --db tenants.db [--workers 8]
+
+Запросы к API Я.Практикум расходуют общий бюджет practicum_bucket,
+поэтому проверка большой группы не превышает PRACTICUM_RPS.
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot import apihelper
+
+from engine import build_bot
+from exceptions import EndpointException
+from homework import fetch_statuses
+from tenants import TenantRegistry, load_tenants
+
+
+def check_practicum_token(tenant):
+    """Описание проблемы с токеном арендатора или None.
+
+    Любая ошибка проверки (например, неразборчивый ответ API)
+    считается проблемой этого арендатора и не прерывает импорт.
+    """
+    try:
+        fetch_statuses(int(time.time()), tenant.headers, tenant.name)
+    except EndpointException as error:
+        if error.fatal:
+            return 'токен Я.Практикум недействителен'
+        return f'API Я.Практикум недоступно: {error}'
+    except Exception as error:
+        return f'ошибка проверки токена Я.Практикум: {error!r}'
+    return None
+
+
+def check_chat(bot, tenant):
+    """Описание проблемы с чатом арендатора или None.
+
+    Сбой запроса к Telegram (например, соединения) считается
+    проблемой этого арендатора и не прерывает импорт.
+    """
+    try:
+        bot.get_chat(tenant.chat_id)
+    except apihelper.ApiException as error:
+        return f'чат {tenant.chat_id} недоступен: {error}'
+    except Exception as error:
+        return f'ошибка проверки чата {tenant.chat_id}: {error!r}'
+    return None
+
+
+def validate_tenant(bot, tenant):
+    """Список проблем арендатора; пустой, если проверка пройдена."""
+    if not tenant.name or not tenant.practicum_token or not tenant.chat_id:
+        return ['не заполнены обязательные столбцы']
+    return [
+        problem for problem in (
+            check_practicum_token(tenant), check_chat(bot, tenant)
+        ) if problem is not None
+    ]
+
+
+def validate_all(bot, tenants, workers=8):
+    """Параллельная проверка арендаторов.
+
+    Возвращаются пары (арендатор, список проблем) в исходном порядке.
+    Повторное имя в файле считается проблемой.
+    """
+    with ThreadPoolExecutor(workers) as executor:
+        problems = list(executor.map(
+            lambda tenant: validate_tenant(bot, tenant), tenants
+        ))
+    names = Counter(tenant.name for tenant in tenants)
+    for tenant, found in zip(tenants, problems):
+        if names[tenant.name] > 1:
+            found.append('имя повторяется в файле')
+    return list(zip(tenants, problems))
+
+
+def report(results):
+    """Строки отчёта о проверке."""
+    invalid = [(tenant, found) for tenant, found in results if found]
+    lines = [
+        f'Проверено: {len(results)}, '
+        f'прошли проверку: {len(results) - len(invalid)}, '
+        f'отклонено: {len(invalid)}'
+    ]
+    for tenant, found in invalid:
+        lines.append(f'  {tenant.name}: {"; ".join(found)}')
+    return lines
+
+
+def main(argv=None):
+    """Командная строка для импорта арендаторов."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('csv', help='CSV-файл с арендаторами')
+    parser.add_argument('--db', required=True, help='реестр арендаторов')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args(argv)
+    tenants = load_tenants(args.csv)
+    results = validate_all(build_bot(), tenants, args.workers)
+    print('\n'.join(report(results)))
+    valid = [tenant for tenant, found in results if not found]
+    registry = TenantRegistry(args.db)
+    try:
+        registry.add_many(valid)
+    finally:
+        registry.close()
+    return 0 if len(valid) == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
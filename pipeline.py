@@ -0,0 +1,141 @@
+"""
+Многостадийный конвейер с ограниченными очередями.
+
+Каждая стадия обрабатывается своим числом потоков и получает элементы
+из ограниченной очереди: если следующая стадия не успевает, предыдущая
+блокируется на записи (backpressure). Глубина очередей публикуется
+в метриках pipeline_queue_depth. При заданном watchdog каждый поток
+отмечает у сторожа начало и конец обработки элемента, поэтому зависший
+на элементе поток (например, на запросе к API) обнаруживается.
+"""
+import logging
+import queue
+import threading
+
+from delivery import partition
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+
+
+class Stage:
+    """Стадия конвейера.
+
+    handler получает элемент и возвращает итерируемое множество
+    элементов для следующей стадии (или None). При заданном key
+    элементы с одинаковым ключом обрабатывает один и тот же поток
+    в порядке поступления.
+    """
+
+    def __init__(self, name, handler, workers=1, maxsize=100, key=None):
+        if workers < 1:
+            raise ValueError(f'Число потоков стадии {name} должно быть > 0')
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.key = key
+        queues = workers if key is not None else 1
+        self.queues = [queue.Queue(maxsize) for _ in range(queues)]
+
+    def put(self, item):
+        """Постановка элемента в очередь стадии."""
+        if self.key is None:
+            jobs = self.queues[0]
+        else:
+            jobs = self.queues[partition(self.key(item), len(self.queues))]
+        jobs.put(item)
+
+    def depth(self):
+        """Число элементов в очередях стадии."""
+        return sum(jobs.qsize() for jobs in self.queues)
+
+    def join(self):
+        """Ожидание обработки всех элементов стадии."""
+        for jobs in self.queues:
+            jobs.join()
+
+
+class Pipeline:
+    """Конвейер из последовательных стадий."""
+
+    def __init__(self, stages, on_error=None, metrics=registry,
+                 watchdog=None):
+        self.stages = stages
+        self.on_error = on_error
+        self.metrics = metrics
+        self.watchdog = watchdog
+        self.threads = []
+        for index, stage in enumerate(stages):
+            for number in range(stage.workers):
+                jobs = stage.queues[number % len(stage.queues)]
+                self.threads.append(threading.Thread(
+                    target=self._work, args=(index, jobs),
+                    name=f'{stage.name}-{number}', daemon=True
+                ))
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, item):
+        """Передача элемента на первую стадию.
+
+        Если очередь первой стадии заполнена, вызов блокируется.
+        """
+        self.stages[0].put(item)
+        self._report(self.stages[0])
+
+    def _report(self, stage):
+        self.metrics.set(
+            'pipeline_queue_depth', stage.depth(), stage=stage.name
+        )
+
+    def _work(self, index, jobs):
+        stage = self.stages[index]
+        following = self.stages[index + 1:index + 2]
+        name = threading.current_thread().name
+        while True:
+            item = jobs.get()
+            try:
+                if item is STOP:
+                    return
+                if self.watchdog is not None:
+                    self.watchdog.beat(name)
+                self._report(stage)
+                for result in stage.handler(item) or ():
+                    for next_stage in following:
+                        next_stage.put(result)
+                        self._report(next_stage)
+                self.metrics.increment('pipeline_items', stage=stage.name)
+            except Exception as error:
+                self.metrics.increment('pipeline_errors', stage=stage.name)
+                if self.on_error is None:
+                    logger.error(f'Ошибка на стадии {stage.name}: {error}')
+                else:
+                    self.on_error(stage, item, error)
+            finally:
+                if self.watchdog is not None:
+                    self.watchdog.idle(name)
+                jobs.task_done()
+
+    def depths(self):
+        """Глубина очередей по стадиям."""
+        return {stage.name: stage.depth() for stage in self.stages}
+
+    def join(self):
+        """Ожидание обработки всех переданных элементов.
+
+        Элементы движутся только вперёд, поэтому достаточно дождаться
+        опустошения стадий по порядку.
+        """
+        for stage in self.stages:
+            stage.join()
+
+    def close(self):
+        """Обработка оставшихся элементов и остановка потоков."""
+        for stage in self.stages:
+            stage.join()
+            for number in range(stage.workers):
+                stage.queues[number % len(stage.queues)].put(STOP)
+        for thread in self.threads:
+            thread.join()
@@ -0,0 +1,85 @@
+"""
+Ограничение частоты запросов.
+
+TokenBucket — общий для процесса бюджет запросов к API Я.Практикум:
+запросы ждут свободный токен, а после ответа 429 или 503 все запросы
+приостанавливаются на время из заголовка Retry-After.
+"""
+import email.utils
+import threading
+import time
+
+
+class TokenBucket:
+    """Корзина токенов с пополнением rate токенов в секунду."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.blocked_until = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = max(0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def _wait_time(self, tokens):
+        now = self.clock()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0
+        return (tokens - self.tokens) / self.rate
+
+    def try_acquire(self, tokens=1):
+        """Получение токена без ожидания."""
+        with self._lock:
+            return self._wait_time(tokens) == 0
+
+    def acquire(self, tokens=1):
+        """Получение токена с ожиданием.
+
+        Возвращается суммарное время ожидания в секундах.
+        """
+        waited = 0
+        while True:
+            with self._lock:
+                delay = self._wait_time(tokens)
+            if not delay:
+                return waited
+            self.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Приостановка выдачи токенов на seconds секунд."""
+        with self._lock:
+            self.blocked_until = max(
+                self.blocked_until, self.clock() + seconds
+            )
+
+
+def parse_retry_after(value, default):
+    """Значение заголовка Retry-After в секундах.
+
+    Заголовок может содержать число секунд или HTTP-дату;
+    при отсутствии или ошибке разбора возвращается default.
+    """
+    if not value:
+        return default
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0, moment.timestamp() - time.time())
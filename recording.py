@@ -0,0 +1,228 @@
+"""
+Запись и воспроизведение трафика бота.
+
+Recorder сохраняет запросы к API Я.Практикум и вызовы Telegram
+вместе с задержками в сжатый JSONL-файл. Replay отдаёт записанные
+ответы в том же порядке и с теми же задержками (при speed=N — в N раз
+быстрее), что позволяет разбирать проблемы производительности
+на реальном трафике без обращения к внешним сервисам.
+"""
+import atexit
+import gzip
+import json
+import threading
+import time
+from collections import deque
+
+from requests.exceptions import ConnectionError
+from telebot import apihelper
+
+
+class Recorder:
+    """Запись вызовов в JSONL-файл, сжатый gzip."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def write(self, entry):
+        """Запись одного вызова."""
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, 'at', encoding='utf-8')
+            self._file.write(line)
+
+    def close(self):
+        """Сброс буфера и закрытие файла."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get(self, get, url, params=None, **kwargs):
+        """HTTP-запрос через get с записью ответа.
+
+        Заголовки не сохраняются, чтобы токены не попадали в запись.
+        """
+        started = time.time()
+        clock = time.monotonic()
+        entry = {'kind': 'practicum', 'url': url, 'params': params}
+        try:
+            response = get(url, params=params, **kwargs)
+        except Exception as error:
+            entry.update(error=repr(error))
+            raise
+        else:
+            entry.update(status=response.status_code, body=body_of(response))
+            return response
+        finally:
+            entry.update(started=started, elapsed=time.monotonic() - clock)
+            self.write(entry)
+
+    def wrap_bot(self, bot):
+        """Бот, вызовы которого записываются."""
+        return RecordingBot(bot, self)
+
+
+def body_of(response):
+    """Тело ответа: JSON, если он разбирается, иначе текст."""
+    try:
+        return {'json': response.json()}
+    except ValueError:
+        return {'text': response.text}
+
+
+class RecordingBot:
+    """Обёртка над TeleBot, записывающая отправку сообщений."""
+
+    def __init__(self, bot, recorder):
+        self.bot = bot
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.bot, name)
+
+    def _call(self, method, params, call):
+        started = time.time()
+        clock = time.monotonic()
+        entry = {'kind': 'telegram', 'method': method, 'params': params}
+        try:
+            message = call()
+        except Exception as error:
+            entry.update(error=str(error))
+            raise
+        else:
+            entry.update(message_id=getattr(message, 'message_id', None))
+            return message
+        finally:
+            entry.update(started=started, elapsed=time.monotonic() - clock)
+            self.recorder.write(entry)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Отправка сообщения с записью вызова."""
+        return self._call(
+            'send_message', {'chat_id': chat_id, 'text': text},
+            lambda: self.bot.send_message(
+                chat_id=chat_id, text=text, **kwargs
+            )
+        )
+
+    def edit_message_text(self, text, chat_id=None, message_id=None,
+                          **kwargs):
+        """Изменение сообщения с записью вызова."""
+        return self._call(
+            'edit_message_text',
+            {'chat_id': chat_id, 'message_id': message_id, 'text': text},
+            lambda: self.bot.edit_message_text(
+                text, chat_id=chat_id, message_id=message_id, **kwargs
+            )
+        )
+
+
+def load_entries(path):
+    """Чтение записанных вызовов."""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayResponse:
+    """Ответ на HTTP-запрос, восстановленный из записи."""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.reason = ''
+        self.headers = {}
+        self._body = body
+        if 'text' in body:
+            self.text = body['text']
+        else:
+            self.text = json.dumps(body.get('json'), ensure_ascii=False)
+        self.content = self.text.encode()
+
+    def json(self):
+        """Тело ответа в виде JSON."""
+        if 'json' not in self._body:
+            raise ValueError('Записанный ответ не содержит JSON')
+        return self._body['json']
+
+    def close(self):
+        """Совместимость с requests.Response."""
+
+
+class ReplayMessage:
+    """Сообщение Telegram, восстановленное из записи."""
+
+    def __init__(self, message_id, chat_id, text):
+        self.message_id = message_id
+        self.chat = chat_id
+        self.text = text
+
+
+class Replay:
+    """Воспроизведение записанного трафика.
+
+    Ответы отдаются в порядке записи отдельно для API Я.Практикум
+    и для Telegram, задержка каждого вызова делится на speed;
+    при speed=0 ответы отдаются без задержки.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, sleep=time.sleep):
+        self.speed = speed
+        self.loop = loop
+        self.sleep = sleep
+        self.queues = {'practicum': deque(), 'telegram': deque()}
+        for entry in load_entries(path):
+            self.queues[entry['kind']].append(entry)
+        self._lock = threading.Lock()
+
+    def next_entry(self, kind):
+        """Следующая запись указанного вида с учётом задержки."""
+        with self._lock:
+            entries = self.queues[kind]
+            if not entries:
+                raise ConnectionError(f'Записи {kind} закончились')
+            entry = entries.popleft()
+            if self.loop:
+                entries.append(entry)
+        if self.speed:
+            self.sleep(entry['elapsed'] / self.speed)
+        return entry
+
+    def get(self, url, **kwargs):
+        """Замена requests.get."""
+        entry = self.next_entry('practicum')
+        if 'error' in entry:
+            raise ConnectionError(entry['error'])
+        return ReplayResponse(entry['status'], entry['body'])
+
+    def bot(self):
+        """Бот, отвечающий записанными результатами."""
+        return ReplayBot(self)
+
+
+class ReplayBot:
+    """Замена TeleBot при воспроизведении."""
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def _call(self, method, chat_id, text):
+        try:
+            entry = self.replay.next_entry('telegram')
+        except ConnectionError as error:
+            raise apihelper.ApiException(str(error), method, None)
+        if 'error' in entry:
+            raise apihelper.ApiException(entry['error'], method, None)
+        return ReplayMessage(entry.get('message_id'), chat_id, text)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Отправка сообщения с записанной задержкой и результатом."""
+        return self._call('send_message', chat_id, text)
+
+    def edit_message_text(self, text, chat_id=None, message_id=None,
+                          **kwargs):
+        """Изменение сообщения с записанной задержкой и результатом."""
+        return self._call('edit_message_text', chat_id, text)
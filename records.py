@@ -0,0 +1,80 @@
+"""
+Компактное представление домашних работ.
+
+Из ответа API сохраняются только используемые ботом поля,
+статусы хранятся членами перечисления, а не строками.
+"""
+from datetime import datetime
+from enum import Enum
+
+
+def parse_date(value):
+    """Разбор даты из ответа API вида 2024-04-11T10:31:09Z."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class HomeworkStatus(Enum):
+    """Статус проверки домашней работы."""
+
+    APPROVED = 'approved'
+    REVIEWING = 'reviewing'
+    REJECTED = 'rejected'
+
+
+class HomeworkRecord:
+    """Запись о домашней работе."""
+
+    __slots__ = ('id', 'name', 'status', 'date_updated', 'lesson_name')
+
+    def __init__(self, name, status, id=None, date_updated=None,
+                 lesson_name=None):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.date_updated = date_updated
+        self.lesson_name = lesson_name
+
+    def __repr__(self):
+        return (
+            f'HomeworkRecord(id={self.id!r}, name={self.name!r}, '
+            f'status={self.status.value!r})'
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, HomeworkRecord):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field)
+            for field in self.__slots__
+        )
+
+    @property
+    def key(self):
+        """Ключ домашней работы: id, а при его отсутствии название."""
+        return self.name if self.id is None else self.id
+
+    @classmethod
+    def from_api(cls, homework):
+        """Создание записи из словаря ответа API.
+
+        В случае отсутствия ключа или неизвестного статуса
+        вызывается KeyError с понятным описанием.
+        """
+        try:
+            status = homework['status']
+            name = homework['homework_name']
+        except KeyError as error:
+            raise KeyError(f'Ключ {error} отсутствует в ответе от API')
+        try:
+            status = HomeworkStatus(status)
+        except ValueError:
+            raise KeyError(
+                f'Получен неожиданный статус домашней работы: {status!r}'
+            )
+        return cls(
+            name=name,
+            status=status,
+            id=homework.get('id'),
+            date_updated=homework.get('date_updated'),
+            lesson_name=homework.get('lesson_name'),
+        )
@@ -0,0 +1,63 @@
+"""
+Политика повторных попыток.
+
+Повторы выполняются с экспоненциально растущей задержкой
+и случайным разбросом (full jitter), чтобы повторы разных
+потоков не совпадали по времени.
+"""
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Число попыток и задержки между ними."""
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=30,
+                 sleep=time.sleep, random=random.random):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.random = random
+
+    def delay(self, attempt):
+        """Задержка перед попыткой attempt (нумерация с 1)."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return ceiling * self.random()
+
+    def should_retry(self, error):
+        """Проверка, что после ошибки имеет смысл повторить попытку."""
+        return True
+
+    def call(self, func, *args, **kwargs):
+        """Вызов func с повторами при ошибках.
+
+        Если все попытки неудачны, пробрасывается последнее исключение.
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                if attempt == self.attempts or not self.should_retry(error):
+                    raise
+                delay = self.delay(attempt)
+                logger.debug(
+                    f'Попытка {attempt} не удалась: {error}. '
+                    f'Повтор через {delay:.2f} с'
+                )
+                self.sleep(delay)
+
+
+class EndpointRetryPolicy(RetryPolicy):
+    """Повторы только для временных ошибок эндпоинта.
+
+    Повторяются EndpointException с признаком retryable, остальные
+    исключения пробрасываются сразу.
+    """
+
+    def should_retry(self, error):
+        """Проверка, что ошибка эндпоинта временная."""
+        return getattr(error, 'retryable', False)
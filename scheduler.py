@@ -0,0 +1,92 @@
+"""
+Планировщик опросов по дедлайнам.
+
+У каждого арендатора (tenant) свой срок следующего опроса,
+сроки хранятся в куче, перепланирование стоит O(log n).
+"""
+import heapq
+import itertools
+
+REMOVED = object()
+
+
+class DeadlineScheduler:
+    """Очередь с приоритетом по сроку следующего опроса.
+
+    Перепланирование не ищет старую запись в куче: она помечается
+    удалённой и пропускается при извлечении (ленивое удаление).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def deadline(self, key):
+        """Срок опроса по ключу или None."""
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def schedule(self, key, deadline):
+        """Назначение или перенос срока опроса."""
+        if key in self._entries:
+            self._discard(key)
+        entry = [deadline, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, key):
+        """Исключение ключа из расписания."""
+        if key in self._entries:
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key)
+        entry[-1] = REMOVED
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                entry for entry in self._heap if entry[-1] is not REMOVED
+            ]
+            heapq.heapify(self._heap)
+
+    def items(self):
+        """Пары (ключ, срок) всех запланированных опросов."""
+        return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def next_deadline(self):
+        """Ближайший срок опроса или None, если расписание пусто."""
+        while self._heap and self._heap[0][-1] is REMOVED:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now, limit=None):
+        """Извлечение ключей, срок опроса которых наступил.
+
+        Возвращается список пар (ключ, срок) в порядке сроков,
+        извлечённые ключи из расписания удаляются.
+        """
+        due = []
+        while self._heap and (limit is None or len(due) < limit):
+            deadline, _, key = self._heap[0]
+            if key is REMOVED:
+                heapq.heappop(self._heap)
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(self._heap)
+            del self._entries[key]
+            due.append((key, deadline))
+        return due
+
+    def spread(self, keys, period, start):
+        """Равномерное распределение первых опросов по периоду."""
+        keys = list(keys)
+        step = period / len(keys) if keys else 0
+        for position, key in enumerate(keys):
+            self.schedule(key, start + position * step)
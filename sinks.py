@@ -0,0 +1,198 @@
+"""
+Каналы доставки уведомлений помимо основного Telegram.
+
+Каждый канал (sink) обслуживается своим потоком с ограниченной
+очередью и своей политикой повторов, поэтому медленный SMTP-сервер
+или вебхук не задерживает доставку в Telegram и в другие каналы.
+Если очередь канала переполнена, новые уведомления для него
+отбрасываются и учитываются в метрике sink_dropped. В Telegram
+уведомления доставляет сам цикл опроса, поэтому отдельного канала
+для него нет.
+"""
+import csv
+import logging
+import queue
+import smtplib
+import threading
+from email.message import EmailMessage
+
+import requests
+
+from metrics import registry
+from retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+
+
+class Sink:
+    """Канал доставки уведомлений."""
+
+    name = 'sink'
+
+    def send(self, chat_id, message):
+        """Доставка сообщения; при неудаче вызывается исключение."""
+        raise NotImplementedError
+
+
+class WebhookSink(Sink):
+    """Доставка POST-запросом с JSON на заданный адрес."""
+
+    name = 'webhook'
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, chat_id, message):
+        """Отправка уведомления на вебхук."""
+        response = requests.post(
+            self.url, json={'chat_id': chat_id, 'text': message},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+
+
+class SmtpSink(Sink):
+    """Доставка письмом через SMTP-сервер.
+
+    Письмо о событии чата получают адреса из routes для этого чата
+    (например, куратор арендатора) и адреса из recipients, которые
+    получают письма обо всех чатах, поэтому туда стоит указывать
+    только адреса администраторов. Если получателей для чата нет,
+    письмо не отправляется. Чат указывается в теме и в тексте письма.
+    Пустые адреса (например, от лишней запятой) пропускаются.
+    """
+
+    name = 'smtp'
+
+    def __init__(self, host, port, sender, recipients=(), routes=None,
+                 timeout=10, subject='Статус проверки домашней работы'):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = clean_addresses(recipients)
+        self.routes = {
+            str(chat_id): clean_addresses(addresses)
+            for chat_id, addresses in (routes or {}).items()
+        }
+        if not self.recipients and not any(self.routes.values()):
+            raise ValueError('Не заданы получатели писем')
+        self.timeout = timeout
+        self.subject = subject
+
+    def recipients_for(self, chat_id):
+        """Адреса, получающие письмо о событии чата chat_id."""
+        return list(dict.fromkeys(
+            [*self.routes.get(str(chat_id), ()), *self.recipients]
+        ))
+
+    def send(self, chat_id, message):
+        """Отправка письма получателям чата."""
+        recipients = self.recipients_for(chat_id)
+        if not recipients:
+            return
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = ', '.join(recipients)
+        email['Subject'] = f'{self.subject} (чат {chat_id})'
+        email.set_content(f'Чат {chat_id}:\n\n{message}')
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(email)
+
+
+def clean_addresses(addresses):
+    """Адреса без пробелов по краям и без пустых значений."""
+    return [address.strip() for address in addresses if address.strip()]
+
+
+def load_smtp_routes(path):
+    """Загрузка адресов по чатам из CSV-файла со столбцами chat_id и email.
+
+    Возвращается словарь {ID чата: список адресов}.
+    """
+    routes = {}
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            routes.setdefault(row['chat_id'].strip(), []).append(row['email'])
+    return routes
+
+
+class SinkWorker:
+    """Поток доставки одного канала с очередью и повторами."""
+
+    def __init__(self, sink, retry_policy=None, maxsize=1000,
+                 metrics=registry):
+        self.sink = sink
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = metrics
+        self.jobs = queue.Queue(maxsize)
+        self.thread = threading.Thread(
+            target=self._work, name=f'sink-{sink.name}', daemon=True
+        )
+        self.thread.start()
+
+    def put(self, chat_id, message):
+        """Постановка уведомления в очередь канала без ожидания."""
+        try:
+            self.jobs.put_nowait((chat_id, message))
+        except queue.Full:
+            self.metrics.increment('sink_dropped', sink=self.sink.name)
+            logger.warning(
+                f'Очередь канала {self.sink.name} переполнена, '
+                'уведомление отброшено'
+            )
+            return False
+        return True
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is STOP:
+                    return
+                self.retry_policy.call(self.sink.send, *job)
+                self.metrics.increment('sink_sent', sink=self.sink.name)
+            except Exception as error:
+                self.metrics.increment('sink_failed', sink=self.sink.name)
+                logger.error(
+                    f'Ошибка доставки через {self.sink.name}: {error}'
+                )
+            finally:
+                self.jobs.task_done()
+
+    def join(self):
+        """Ожидание доставки поставленных уведомлений."""
+        self.jobs.join()
+
+    def close(self):
+        """Доставка оставшихся уведомлений и остановка потока."""
+        self.jobs.put(STOP)
+        self.thread.join()
+
+
+class Notifier:
+    """Параллельная рассылка уведомлений по всем каналам."""
+
+    def __init__(self, workers):
+        self.workers = workers
+
+    def notify(self, chat_id, message):
+        """Постановка уведомления в очереди всех каналов.
+
+        Вызывается один раз на событие, а не на каждый чат,
+        в который оно рассылается в Telegram.
+        """
+        for worker in self.workers:
+            worker.put(chat_id, message)
+
+    def join(self):
+        """Ожидание доставки во все каналы."""
+        for worker in self.workers:
+            worker.join()
+
+    def close(self):
+        """Остановка всех каналов."""
+        for worker in self.workers:
+            worker.close()
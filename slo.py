@@ -0,0 +1,166 @@
+"""
+Задержка уведомлений и достижение SLO.
+
+Задержка уведомления — интервал от date_updated работы (момента,
+когда ревьюер изменил статус) до успешной доставки сообщения в Telegram.
+Задержки собираются в гистограммы с фиксированными границами
+по арендаторам и в целом; доля уведомлений, доставленных не позже
+target секунд, сравнивается с целью objective.
+"""
+import bisect
+import logging
+import threading
+import time
+
+from metrics import registry
+from records import parse_date
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (10, 30, 60, 120, 300, 600, 900, 1200, 1800, 3600, 7200, 86400)
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с фиксированными границами корзин.
+
+    Последняя корзина собирает все значения больше последней границы.
+    """
+
+    __slots__ = ('bounds', 'counts', 'total', 'sum')
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Учёт одного значения."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def within(self, threshold):
+        """Доля значений не больше threshold.
+
+        Учитываются только корзины, граница которых не больше threshold,
+        поэтому значение точно, только если threshold — одна из границ.
+        """
+        if not self.total:
+            return None
+        index = bisect.bisect_right(self.bounds, threshold)
+        return sum(self.counts[:index]) / self.total
+
+    def quantile(self, q):
+        """Оценка квантиля сверху: граница корзины, где он находится."""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        """Пары (граница, число значений не больше неё)."""
+        seen = 0
+        pairs = []
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            pairs.append((bound, seen))
+        pairs.append(('+Inf', self.total))
+        return pairs
+
+
+class SloTracker:
+    """Учёт задержек уведомлений по арендаторам и в целом.
+
+    Доля уведомлений в пределах target считается точно: target
+    добавляется к границам корзин гистограмм, если его там нет.
+    В метрики публикуются гистограмма notification_latency_seconds
+    в целом и показатель slo_attainment для каждого арендатора
+    и без метки арендатора для всех вместе. Раз в report_interval
+    секунд отчёт по арендаторам пишется в лог.
+    """
+
+    def __init__(self, target=900, objective=0.95, metrics=registry,
+                 clock=time.time, report_interval=3600):
+        self.target = target
+        self.objective = objective
+        self.metrics = metrics
+        self.clock = clock
+        self.report_interval = report_interval
+        self.reported = clock()
+        self.bounds = tuple(sorted({*BUCKETS, target}))
+        self.overall = LatencyHistogram(self.bounds)
+        self.tenants = {}
+        self._lock = threading.Lock()
+
+    def observe(self, tenant, date_updated, delivered_at=None):
+        """Учёт доставки уведомления о статусе с датой date_updated.
+
+        Возвращается задержка в секундах или None, если дата
+        отсутствует или не разбирается.
+        """
+        if not date_updated:
+            return None
+        try:
+            updated = parse_date(date_updated).timestamp()
+        except (TypeError, ValueError):
+            logger.debug(f'Неизвестный формат date_updated: {date_updated!r}')
+            return None
+        if delivered_at is None:
+            delivered_at = self.clock()
+        latency = max(0.0, delivered_at - updated)
+        with self._lock:
+            histogram = self.tenants.get(tenant)
+            if histogram is None:
+                histogram = self.tenants[tenant] = LatencyHistogram(
+                    self.bounds
+                )
+            histogram.observe(latency)
+            self.overall.observe(latency)
+            tenant_attainment = histogram.within(self.target)
+            attainment = self.overall.within(self.target)
+            cumulative = self.overall.cumulative()
+            due = delivered_at - self.reported >= self.report_interval
+            if due:
+                self.reported = delivered_at
+        for bound, count in cumulative:
+            self.metrics.set(
+                'notification_latency_seconds_bucket', count, le=bound
+            )
+        self.metrics.increment('notification_latency_seconds_count')
+        self.metrics.increment('notification_latency_seconds_sum', latency)
+        self.metrics.set('slo_attainment', attainment)
+        self.metrics.set('slo_attainment', tenant_attainment, tenant=tenant)
+        if latency > self.target:
+            logger.debug(
+                f'{tenant}: уведомление доставлено через {latency:.0f} с, '
+                f'цель {self.target} с'
+            )
+        if due:
+            logger.info('Задержка уведомлений:\n' + '\n'.join(self.report()))
+        return latency
+
+    def report(self):
+        """Строки отчёта о задержках и достижении SLO."""
+        lines = [
+            f'{"Арендатор":<30} {"Уведомл.":>9} {"p50, с":>8} '
+            f'{"p95, с":>8} {"SLO":>7}'
+        ]
+        with self._lock:
+            rows = sorted(self.tenants.items())
+            rows.append(('Всего', self.overall))
+            for name, histogram in rows:
+                attainment = histogram.within(self.target) or 0.0
+                mark = '' if attainment >= self.objective else ' !'
+                lines.append(
+                    f'{str(name):<30} {histogram.total:>9} '
+                    f'{histogram.quantile(0.5) or 0:>8} '
+                    f'{histogram.quantile(0.95) or 0:>8} '
+                    f'{attainment:>7.1%}{mark}'
+                )
+        return lines
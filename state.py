@@ -0,0 +1,66 @@
+"""
+Сохранение расписания опросов между перезапусками.
+
+Для каждого арендатора хранится время следующего опроса (по часам
+системы, а не монотонным, чтобы оно имело смысл после перезапуска)
+и from_date последнего успешного опроса. После развёртывания
+engine.py продолжает расписание вместо одновременного опроса всех
+арендаторов и не теряет переходы статусов за время простоя.
+Для арендаторов, опрос которых отключён из-за постоянной ошибки,
+сохраняется причина отключения: после перезапуска они остаются
+отключёнными и не получают повторного уведомления.
+"""
+import sqlite3
+
+
+class ScheduleStore:
+    """Расписание опросов в SQLite."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS schedule ('
+                'tenant TEXT PRIMARY KEY, next_poll REAL NOT NULL, '
+                'from_date INTEGER, disabled TEXT)'
+            )
+            columns = {
+                row[1] for row in self.connection.execute(
+                    'PRAGMA table_info(schedule)'
+                )
+            }
+            if 'disabled' not in columns:
+                self.connection.execute(
+                    'ALTER TABLE schedule ADD COLUMN disabled TEXT'
+                )
+
+    def save(self, rows):
+        """Замена расписания одной транзакцией.
+
+        Строка: (арендатор, время следующего опроса, from_date,
+        причина отключения или None).
+        """
+        with self.connection:
+            self.connection.execute('DELETE FROM schedule')
+            self.connection.executemany(
+                'INSERT INTO schedule (tenant, next_poll, from_date, '
+                'disabled) VALUES (?, ?, ?, ?)', rows
+            )
+
+    def load(self):
+        """Словарь {арендатор: (время следующего опроса, from_date,
+        причина отключения или None)}.
+        """
+        return {
+            tenant: (next_poll, from_date, disabled)
+            for tenant, next_poll, from_date, disabled in (
+                self.connection.execute(
+                    'SELECT tenant, next_poll, from_date, disabled '
+                    'FROM schedule'
+                )
+            )
+        }
+
+    def close(self):
+        """Закрытие соединения."""
+        self.connection.close()
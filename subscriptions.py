@@ -0,0 +1,46 @@
+"""
+Подписки чатов на уведомления арендаторов.
+
+Кроме чата самого арендатора уведомления о его домашних работах
+могут получать чаты наставников и учебных групп.
+"""
+import csv
+from collections import defaultdict
+
+
+class Subscriptions:
+    """Отображение имени арендатора в дополнительные чаты."""
+
+    def __init__(self, chats=None):
+        self.chats = defaultdict(list)
+        for tenant, chat_ids in (chats or {}).items():
+            for chat_id in chat_ids:
+                self.subscribe(tenant, chat_id)
+
+    def subscribe(self, tenant, chat_id):
+        """Подписка чата на уведомления арендатора."""
+        if chat_id not in self.chats[tenant]:
+            self.chats[tenant].append(chat_id)
+
+    def unsubscribe(self, tenant, chat_id):
+        """Отмена подписки чата."""
+        if chat_id in self.chats.get(tenant, ()):
+            self.chats[tenant].remove(chat_id)
+
+    def chats_for(self, tenant):
+        """Все чаты, получающие уведомления арендатора.
+
+        Первым идёт чат самого арендатора, повторы исключаются.
+        """
+        return list(dict.fromkeys(
+            [tenant.chat_id, *self.chats.get(tenant.name, ())]
+        ))
+
+
+def load_subscriptions(path):
+    """Загрузка подписок из CSV-файла со столбцами tenant и chat_id."""
+    subscriptions = Subscriptions()
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            subscriptions.subscribe(row['tenant'], row['chat_id'])
+    return subscriptions
@@ -0,0 +1,84 @@
+"""
+Арендаторы (tenants) бота.
+
+Арендатор — студент, статусы домашних работ которого опрашивает бот:
+токен Я.Практикум и чат, в который отправляются уведомления.
+Арендаторы читаются из CSV-файла или из реестра в SQLite,
+который заполняется командой python onboarding.py.
+"""
+import csv
+import sqlite3
+import time
+
+
+class Tenant:
+    """Арендатор: имя, токен Я.Практикум и ID чата."""
+
+    __slots__ = ('name', 'practicum_token', 'chat_id')
+
+    def __init__(self, name, practicum_token, chat_id):
+        self.name = name
+        self.practicum_token = practicum_token
+        self.chat_id = chat_id
+
+    def __repr__(self):
+        return f'Tenant(name={self.name!r}, chat_id={self.chat_id!r})'
+
+    @property
+    def headers(self):
+        """Заголовки запроса к API Я.Практикум."""
+        return {'Authorization': f'OAuth {self.practicum_token}'}
+
+
+def load_tenants(path):
+    """Загрузка арендаторов из CSV-файла.
+
+    Файл должен содержать столбцы name, practicum_token и chat_id.
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        return [
+            Tenant(row['name'], row['practicum_token'], row['chat_id'])
+            for row in csv.DictReader(file)
+        ]
+
+
+class TenantRegistry:
+    """Реестр арендаторов в SQLite."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS tenants ('
+                'name TEXT PRIMARY KEY, practicum_token TEXT NOT NULL, '
+                'chat_id TEXT NOT NULL, added_at REAL NOT NULL)'
+            )
+
+    def add_many(self, tenants):
+        """Добавление или обновление арендаторов одной транзакцией."""
+        added_at = time.time()
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO tenants (name, practicum_token, chat_id, '
+                'added_at) VALUES (?, ?, ?, ?) ON CONFLICT (name) DO UPDATE '
+                'SET practicum_token = excluded.practicum_token, '
+                'chat_id = excluded.chat_id, added_at = excluded.added_at',
+                [
+                    (tenant.name, tenant.practicum_token,
+                     str(tenant.chat_id), added_at)
+                    for tenant in tenants
+                ]
+            )
+
+    def load(self):
+        """Все арендаторы реестра в порядке имён."""
+        return [
+            Tenant(*row) for row in self.connection.execute(
+                'SELECT name, practicum_token, chat_id FROM tenants '
+                'ORDER BY name'
+            )
+        ]
+
+    def close(self):
+        """Закрытие соединения."""
+        self.connection.close()
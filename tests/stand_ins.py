@@ -0,0 +1,146 @@
+import gzip
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeClock:
+    """Manually advanced clock; sleep() moves it forward."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Server:
+    """Base for local stand-in servers running in a daemon thread."""
+
+    def __enter__(self):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+
+class WebhookServer(Server):
+    """Collects JSON bodies of POST requests."""
+
+    def __init__(self, delay=0.0, fail_first=0):
+        self.received = []
+        self.delay = delay
+        self.failures_left = fail_first
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                body = json.loads(self.rfile.read(length))
+                time.sleep(stand_in.delay)
+                if stand_in.failures_left:
+                    stand_in.failures_left -= 1
+                    self.send_response(502)
+                else:
+                    stand_in.received.append(body)
+                    self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}/hook'
+
+
+class StatusesServer(Server):
+    """Serves a JSON body, gzip-compressed when the client accepts it.
+
+    Every response is delayed by the current value of ``delay``.
+    """
+
+    def __init__(self, data, delay=0.0):
+        self.data = data
+        self.delay = delay
+        self.accept_encoding = None
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.accept_encoding = self.headers['Accept-Encoding']
+                time.sleep(stand_in.delay)
+                body = json.dumps(stand_in.data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if 'gzip' in (stand_in.accept_encoding or ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}/api/user_api/homework_statuses/'
+
+
+class SmtpServer(Server):
+    """Minimal SMTP server that stores DATA of accepted messages."""
+
+    def __init__(self, delay=0.0):
+        self.messages = []
+        self.delay = delay
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(f'{line}\r\n'.encode())
+
+            def handle(self):
+                self.reply('220 localhost ready')
+                while True:
+                    line = self.rfile.readline().decode().strip()
+                    command = line[:4].upper()
+                    if not line or command == 'QUIT':
+                        self.reply('221 bye')
+                        return
+                    if command == 'DATA':
+                        self.reply('354 go ahead')
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline().decode()
+                            if chunk.rstrip('\r\n') == '.':
+                                break
+                            data.append(chunk)
+                        time.sleep(stand_in.delay)
+                        stand_in.messages.append(''.join(data))
+                    self.reply('250 ok')
+
+        self.server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0), Handler
+        )
+        self.server.daemon_threads = True
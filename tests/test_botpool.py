@@ -0,0 +1,90 @@
+import pytest
+from telebot import apihelper
+
+from botpool import BotPool
+from metrics import Metrics
+from tests.stand_ins import FakeClock
+
+
+def too_many_requests(retry_after=5):
+    return apihelper.ApiTelegramException(
+        'sendMessage', None, {
+            'error_code': 429, 'description': 'Too Many Requests',
+            'parameters': {'retry_after': retry_after}
+        }
+    )
+
+
+class RecordingBot:
+    def __init__(self, fail_with=None, failures=None, token=None):
+        self.sent = []
+        self.fail_with = fail_with
+        self.failures = failures
+        if token is not None:
+            self.token = token
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.fail_with is not None and self.failures != 0:
+            if self.failures is not None:
+                self.failures -= 1
+            raise self.fail_with
+        self.sent.append((chat_id, text))
+
+    def edit_message_text(self, text, chat_id=None, message_id=None,
+                          **kwargs):
+        self.sent.append((chat_id, text, message_id))
+
+
+class TestBotPool:
+
+    def test_chats_are_pinned_to_bots(self):
+        bots = [RecordingBot() for _ in range(4)]
+        pool = BotPool(bots, rate=1e9, metrics=Metrics())
+        for chat_id in range(100):
+            pool.send_message(chat_id=chat_id, text='Статус')
+            pool.edit_message_text('Статус', chat_id=chat_id, message_id=1)
+        assert all(bot.sent for bot in bots)
+        for index, bot in enumerate(bots):
+            assert {message[0] for message in bot.sent} == {
+                chat_id for chat_id in range(100)
+                if pool.index_for(chat_id) == index
+            }
+
+    def test_chats_stay_pinned_when_bot_is_added(self):
+        bots = [RecordingBot(token=f'token{number}') for number in range(4)]
+        pool = BotPool(bots[:3], rate=1e9, metrics=Metrics())
+        grown = BotPool(bots, rate=1e9, metrics=Metrics())
+        moved = [
+            chat_id for chat_id in range(1000)
+            if grown.bots[grown.index_for(chat_id)]
+            is not pool.bots[pool.index_for(chat_id)]
+        ]
+        assert all(
+            grown.index_for(chat_id) == 3 for chat_id in moved
+        ), 'Переезжают только чаты, доставшиеся новому боту.'
+        assert 150 < len(moved) < 350
+
+    def test_rate_limited_message_is_retried(self):
+        clock = FakeClock()
+        bot = RecordingBot(fail_with=too_many_requests(5), failures=1)
+        metrics = Metrics()
+        pool = BotPool(
+            [bot], rate=1e9, metrics=metrics, clock=clock, sleep=clock.sleep
+        )
+        pool.send_message(chat_id=1, text='Статус')
+        assert bot.sent == [(1, 'Статус')]
+        assert clock.now >= 5, 'Повтор выполняется после паузы.'
+        assert metrics.get('telegram_rate_limited', bot=0) == 1
+
+    def test_rate_limited_bot_is_paused(self):
+        bots = [RecordingBot(fail_with=too_many_requests(5)), RecordingBot()]
+        metrics = Metrics()
+        pool = BotPool(bots, rate=1e9, retries=0, metrics=metrics)
+        chat_id = next(
+            chat_id for chat_id in range(100) if pool.index_for(chat_id) == 0
+        )
+        with pytest.raises(apihelper.ApiTelegramException):
+            pool.send_message(chat_id=chat_id, text='Статус')
+        assert not pool.buckets[0].try_acquire()
+        assert pool.buckets[1].try_acquire()
+        assert metrics.get('telegram_rate_limited', bot=0) == 1
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+import requests
+
+import homework
+import tests.check_utils as check_utils
+from concurrency import AdaptiveLimiter
+from exceptions import EndpointException
+from metrics import Metrics
+from ratelimit import TokenBucket
+from tests.stand_ins import FakeClock, StatusesServer
+
+
+def fail(error):
+    raise error
+
+
+def saturate(limiter, latency, rounds):
+    """Полностью занятый лимит, каждый запрос с задержкой latency."""
+    for _ in range(rounds):
+        slots = int(limiter.limit)
+        for _ in range(slots):
+            limiter.acquire()
+        for _ in range(slots):
+            limiter.clock.now += latency
+            limiter.release(latency)
+
+
+class TestAdaptiveLimiter:
+
+    def test_limit_grows_while_latency_is_flat(self):
+        metrics = Metrics()
+        limiter = AdaptiveLimiter(initial=1, max_limit=8, clock=FakeClock(),
+                                  metrics=metrics)
+        saturate(limiter, 0.05, rounds=20)
+        assert limiter.limit == 8
+        assert metrics.get('concurrency_limit', upstream='practicum') == 8
+
+    def test_initial_limit_is_within_bounds(self):
+        metrics = Metrics()
+        limiter = AdaptiveLimiter(initial=4, max_limit=2, metrics=metrics)
+        assert limiter.limit == 2
+        assert metrics.get('concurrency_limit', upstream='practicum') == 2
+        limiter.acquire()
+        limiter.acquire()
+        assert limiter.in_flight == 2
+        assert AdaptiveLimiter(
+            initial=0, min_limit=1, metrics=Metrics()
+        ).limit == 1
+
+    def test_limit_is_cut_on_latency_and_errors(self):
+        limiter = AdaptiveLimiter(initial=8, clock=FakeClock(),
+                                  metrics=Metrics())
+        saturate(limiter, 0.05, rounds=2)
+        peak = limiter.limit
+        saturate(limiter, 0.5, rounds=1)
+        assert limiter.limit <= peak / 2
+        cut = limiter.limit
+        limiter.clock.now += 10
+        with pytest.raises(EndpointException):
+            limiter.call(fail, EndpointException('endpoint', 502))
+        assert limiter.limit == max(1, cut / 2)
+
+    def test_fatal_errors_do_not_cut_limit(self):
+        limiter = AdaptiveLimiter(initial=4, metrics=Metrics())
+
+        with pytest.raises(EndpointException):
+            limiter.call(fail, EndpointException('endpoint', 401))
+        assert limiter.limit == 4
+
+    def test_failed_calls_do_not_raise_limit(self):
+        limiter = AdaptiveLimiter(initial=1, metrics=Metrics())
+        for error in (
+            EndpointException('endpoint', 401), ValueError('decode')
+        ):
+            with pytest.raises(type(error)):
+                limiter.call(fail, error)
+        assert limiter.limit == 1, (
+            'Неудачный запрос не должен увеличивать лимит.'
+        )
+
+    def test_only_round_trip_is_measured(self, monkeypatch):
+        clock = FakeClock()
+
+        class SlowBucket:
+            def acquire(self):
+                clock.now += 60
+
+        def mock_get(*args, **kwargs):
+            clock.now += 0.2
+            return check_utils.MockResponseGET(random_timestamp=1)
+
+        monkeypatch.setattr(homework, 'practicum_bucket', SlowBucket())
+        monkeypatch.setattr(requests, 'get', mock_get)
+        limiter = AdaptiveLimiter(clock=clock, metrics=Metrics())
+        homework.fetch_statuses(0, {}, 't', limiter)
+        assert limiter.latency == pytest.approx(0.2), (
+            'Ожидание корзины токенов не входит в задержку API.'
+        )
+        assert limiter.in_flight == 0
+
+    def test_congested_response_cuts_limit(self):
+        limiter = AdaptiveLimiter(initial=8, metrics=Metrics())
+        limiter.call(lambda: check_utils.MockResponseGET(http_status=503))
+        assert limiter.limit == 4
+
+    def test_adapts_to_degrading_server(self, monkeypatch):
+        monkeypatch.setattr(homework, 'practicum_bucket', TokenBucket(1e9))
+        limiter = AdaptiveLimiter(initial=1, max_limit=16, metrics=Metrics())
+        data = {'homeworks': [], 'current_date': 1}
+        with StatusesServer(data, delay=0.01) as server:
+            monkeypatch.setattr(homework, 'ENDPOINT', server.url)
+
+            def poll(requests_qty):
+                def worker():
+                    for _ in range(requests_qty):
+                        limiter.call(homework.fetch_statuses, 0, {})
+
+                threads = [threading.Thread(target=worker) for _ in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            poll(8)
+            healthy = limiter.limit
+            assert healthy >= 4, 'Лимит должен расти при ровной задержке.'
+            server.delay = 0.15
+            poll(1)
+            assert limiter.limit <= healthy / 2, (
+                'Лимит должен снижаться при росте задержки.'
+            )
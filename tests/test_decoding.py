@@ -0,0 +1,24 @@
+import pytest
+
+import tests.check_utils as check_utils
+from decoding import DECODERS, decode_json
+from recording import ReplayResponse
+
+BODY = '{"homeworks": [{"homework_name": "hw.zip", "status": "approved"}]}'
+
+
+class TestDecoding:
+
+    @pytest.mark.parametrize('name', sorted(DECODERS))
+    def test_decoders_agree(self, name):
+        assert DECODERS[name](BODY.encode()) == DECODERS['json'](BODY)
+        with pytest.raises(ValueError):
+            DECODERS[name](b'{"homeworks": ')
+
+    def test_decodes_from_bytes(self):
+        response = ReplayResponse(200, {'text': BODY})
+        assert decode_json(response)['homeworks'][0]['status'] == 'approved'
+
+    def test_falls_back_to_response_json(self):
+        response = check_utils.MockResponseGET(data={'homeworks': []})
+        assert decode_json(response) == {'homeworks': []}
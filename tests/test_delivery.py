@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+
+from delivery import ALERT, STOP, DeliveryPool, LaneQueue, partition
+from metrics import Metrics
+
+
+class TestDeliveryPool:
+
+    def test_order_is_kept_per_chat(self):
+        received = defaultdict(list)
+
+        def send(chat_id, number):
+            time.sleep(random.random() / 1000)
+            received[chat_id].append(number)
+
+        pool = DeliveryPool(send, workers=4)
+        for number in range(200):
+            pool.submit(number % 10, number)
+        pool.close()
+        for chat_id, numbers in received.items():
+            assert numbers == sorted(numbers), (
+                f'Нарушен порядок сообщений в чате {chat_id}.'
+            )
+        assert sum(map(len, received.values())) == 200
+
+    def test_slow_chat_does_not_block_others(self):
+        slow_chat = 0
+        fast_chat = next(
+            chat for chat in range(1, 100)
+            if partition(chat, 2) != partition(slow_chat, 2)
+        )
+        release = threading.Event()
+        fast_sent = threading.Event()
+
+        def send(chat_id):
+            if chat_id == slow_chat:
+                release.wait(1)
+            else:
+                fast_sent.set()
+
+        pool = DeliveryPool(send, workers=2)
+        pool.submit(slow_chat)
+        pool.submit(fast_chat)
+        assert fast_sent.wait(0.5), (
+            'Медленный чат не должен задерживать остальные.'
+        )
+        release.set()
+        pool.close()
+
+    def test_errors_do_not_stop_worker(self):
+        sent = []
+
+        def send(chat_id, text):
+            if text == 'bad':
+                raise RuntimeError(text)
+            sent.append(text)
+
+        pool = DeliveryPool(send, workers=1)
+        pool.submit(1, 'bad')
+        pool.submit(1, 'good')
+        pool.join()
+        assert sent == ['good']
+        pool.close()
+
+    def test_pool_size_must_be_positive(self):
+        with pytest.raises(ValueError):
+            DeliveryPool(print, workers=0)
+
+    def test_status_lane_goes_before_alerts(self):
+        sent = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def send(chat_id, text):
+            if text == 'first':
+                started.set()
+                release.wait(1)
+            sent.append(text)
+
+        pool = DeliveryPool(send, workers=1, metrics=Metrics())
+        pool.submit(1, 'first')
+        started.wait(1)
+        pool.submit(1, 'alert 1', lane=ALERT)
+        pool.submit(1, 'alert 2', lane=ALERT)
+        pool.submit(1, 'status')
+        assert pool.depths() == {'status': 1, 'alert': 2}
+        release.set()
+        pool.close()
+        assert sent == ['first', 'status', 'alert 1', 'alert 2']
+
+    def test_priority_is_per_partition(self):
+        sent = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def send(chat_id, text):
+            if text == 'first':
+                started.set()
+                release.wait(1)
+            sent.append(text)
+
+        pool = DeliveryPool(send, workers=2, metrics=Metrics())
+        busy = 0
+        idle = next(
+            chat_id for chat_id in range(1, 100)
+            if partition(chat_id, 2) != partition(busy, 2)
+        )
+        pool.submit(busy, 'first')
+        started.wait(1)
+        pool.submit(busy, 'status')
+        pool.submit(idle, 'alert', lane=ALERT)
+        for _ in range(100):
+            if 'alert' in sent:
+                break
+            time.sleep(0.01)
+        assert sent == ['alert'], (
+            'Сообщение об ошибке в другом разделе не ждёт уведомлений '
+            'о статусах: приоритет действует внутри раздела.'
+        )
+        release.set()
+        pool.close()
+        assert sent == ['alert', 'first', 'status']
+
+    def test_oldest_alerts_are_dropped(self):
+        metrics = Metrics()
+        jobs = LaneQueue(maxsize=10, alert_maxsize=2, metrics=metrics)
+        for number in range(5):
+            jobs.put(number, ALERT)
+        jobs.close()
+        assert [jobs.get(), jobs.get(), jobs.get()] == [3, 4, STOP]
+        assert metrics.get('delivery_dropped', lane=ALERT) == 3
+        assert metrics.get('delivery_queue_depth', lane=ALERT) == 0
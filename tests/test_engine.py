@@ -0,0 +1,379 @@
+import time
+
+import pytest
+import requests
+
+import homework
+import tests.check_utils as check_utils
+from concurrency import AdaptiveLimiter
+from engine import Engine
+from leases import ShardLeaser, SQLiteLeaseStore
+from metrics import Metrics
+from ratelimit import TokenBucket
+from retry import EndpointRetryPolicy
+from sinks import Notifier
+from slo import SloTracker
+from state import ScheduleStore
+from subscriptions import Subscriptions
+from tenants import Tenant
+from tests.stand_ins import FakeClock
+
+
+@pytest.fixture(autouse=True)
+def unlimited_bucket(monkeypatch):
+    monkeypatch.setattr(homework, 'practicum_bucket', TokenBucket(1e9))
+    monkeypatch.setattr(
+        homework, 'fetch_retry', EndpointRetryPolicy(sleep=lambda delay: None)
+    )
+
+
+def make_engine(tenants_qty=3):
+    clock = FakeClock()
+    tenants = [Tenant(f't{number}', f'token{number}', number)
+               for number in range(tenants_qty)]
+    bot = check_utils.MockTelegramBot()
+    return Engine(bot, tenants, period=600, clock=clock), clock
+
+
+class TestEngine:
+
+    def test_polls_are_spread_over_period(self, monkeypatch):
+        tokens = []
+
+        def mock_get(url, headers=None, params=None, **kwargs):
+            tokens.append(headers['Authorization'])
+            return check_utils.MockResponseGET(data={
+                'homeworks': [], 'current_date': 1
+            })
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        engine, clock = make_engine()
+        assert engine.run_once() == 1
+        clock.now = 200
+        assert engine.run_once() == 1
+        clock.now = 400
+        assert engine.run_once() == 1
+        assert tokens == ['OAuth token0', 'OAuth token1', 'OAuth token2']
+        assert engine.scheduler.deadline('t0') == 600
+
+    def test_poll_sends_status_to_tenant_chat(
+            self, monkeypatch, data_with_new_hw_status
+    ):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                data=data_with_new_hw_status
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        engine.run_once()
+        assert engine.bot.chat_id == 0
+        assert 'hw123.zip' in engine.bot.text
+        assert engine.timestamps['t0'] == (
+            data_with_new_hw_status['current_date']
+        )
+
+    def test_error_is_reported_once(self, monkeypatch):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                http_status=500
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        for clock.now in (0, 600, 1200):
+            engine.run_once()
+        assert len(sent) == 1
+
+    def test_rate_limited_tenant_is_retried_without_alert(
+            self, monkeypatch
+    ):
+        def mock_get(*args, **kwargs):
+            response = check_utils.MockResponseGET(http_status=429)
+            response.headers = {'Retry-After': '30'}
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        engine, clock = make_engine(tenants_qty=1)
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        engine.run_once()
+        assert sent == []
+        assert engine.scheduler.deadline('t0') == 30
+
+    def test_tenants_of_foreign_shards_are_skipped(
+            self, monkeypatch, tmp_path
+    ):
+        calls = []
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: calls.append(1)
+        )
+        store = SQLiteLeaseStore(tmp_path / 'leases.db')
+        store.acquire(0, 'other', ttl=60)
+        engine, clock = make_engine(tenants_qty=1)
+        engine.leaser = ShardLeaser(store, 'me', shards=1, clock=clock)
+        engine.run_once()
+        assert calls == []
+        assert engine.scheduler.deadline('t0') == 600
+
+    def test_new_shard_owner_resumes_from_cursor(
+            self, monkeypatch, tmp_path
+    ):
+        from_dates = []
+
+        def mock_get(url, headers=None, params=None, **kwargs):
+            from_dates.append(params['from_date'])
+            return check_utils.MockResponseGET(data={
+                'homeworks': [], 'current_date': 500
+            })
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        store = SQLiteLeaseStore(tmp_path / 'leases.db')
+        store.acquire(0, 'other', ttl=60)
+        store.save_cursor('t0', 100)
+        engine, clock = make_engine(tenants_qty=1)
+        engine.leaser = ShardLeaser(store, 'me', shards=1, clock=clock)
+        engine.run_once()
+        assert from_dates == []
+        store.release(0, 'other')
+        clock.now = 600
+        engine.run_once()
+        assert from_dates == [100], (
+            'Новый владелец шарда продолжает опрос с курсора предыдущего.'
+        )
+        assert store.load_cursors(['t0']) == {'t0': 500}
+
+    def test_lost_shard_is_not_polled_by_pipeline(
+            self, monkeypatch, tmp_path
+    ):
+        calls = []
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: calls.append(1)
+        )
+        store = SQLiteLeaseStore(tmp_path / 'leases.db')
+        engine, clock = make_engine(tenants_qty=1)
+        engine.leaser = ShardLeaser(store, 'me', shards=1, clock=clock)
+        engine.leaser.refresh()
+        clock.now = 600
+        assert engine.fetch_stage(engine.tenants['t0']) == [], (
+            'Аренда не продлевалась дольше ttl, опрос не выполняется.'
+        )
+        assert calls == []
+
+    def test_leases_are_released_on_stop(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                random_timestamp=1
+            )
+        )
+        store = SQLiteLeaseStore(tmp_path / 'leases.db')
+        engine, clock = make_engine(tenants_qty=1)
+        engine.leaser = ShardLeaser(store, 'me', shards=2, clock=clock)
+
+        def stop(seconds):
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            engine.run_forever(sleep=stop)
+        assert engine.leaser.owned == frozenset()
+        assert store.acquire(0, 'other', ttl=60), (
+            'Шарды остановленной реплики сразу доступны другим.'
+        )
+        assert store.acquire(1, 'other', ttl=60)
+
+    def test_status_is_broadcast_to_subscribers(
+            self, monkeypatch, data_with_new_hw_status
+    ):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                data=data_with_new_hw_status
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        engine.subscriptions = Subscriptions({'t0': [10, 11]})
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        engine.run_once()
+        assert [message['chat_id'] for message in sent] == [0, 10, 11]
+        assert len({message['text'] for message in sent}) == 1
+
+    def test_sinks_get_one_notification_per_event(
+            self, monkeypatch, data_with_new_hw_status
+    ):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                data=data_with_new_hw_status
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        engine.subscriptions = Subscriptions({'t0': [10, 11]})
+        published = []
+        engine.notifier = Notifier([])
+        engine.notifier.notify = lambda *args: published.append(args)
+        engine.bot.send_message = lambda **kwargs: None
+        engine.run_once()
+        assert len(published) == 1, (
+            'Дополнительные каналы получают событие один раз, '
+            'а не на каждый чат.'
+        )
+        assert published[0][0] == 0
+
+    def test_fatal_error_disables_tenant(self, monkeypatch):
+        calls = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(1)
+            return check_utils.MockResponseGET(http_status=401)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        engine, clock = make_engine(tenants_qty=1)
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        engine.run_once()
+        clock.now = 600
+        assert engine.run_once() == 0
+        assert calls == [1], 'Постоянная ошибка не должна повторяться.'
+        assert len(sent) == 1
+        assert 't0' in engine.disabled
+        engine.enable('t0')
+        assert engine.run_once() == 1
+
+    def test_transient_error_is_retried_within_cycle(self, monkeypatch):
+        responses = iter([502, 200])
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                http_status=next(responses), random_timestamp=1
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        engine.run_once()
+        assert sent == []
+        assert engine.timestamps['t0'] == 1
+
+    def test_schedule_survives_restart(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(time, 'time', lambda: 10_000.0)
+        store = ScheduleStore(tmp_path / 'state.db')
+        engine, clock = make_engine(tenants_qty=4)
+        engine.timestamps['t1'] = 9_000
+        engine.state_store = store
+        engine.save_state()
+        saved = store.load()
+        assert saved['t1'] == (10_150.0, 9_000, None)
+        saved['t0'] = (9_990.0, 8_000, None)
+        saved['t2'] = (9_980.0, 8_000, None)
+        del saved['t3']
+        restarted, clock = make_engine(tenants_qty=4)
+        clock.now = 50
+        restarted.restore(saved)
+        assert restarted.timestamps['t0'] == 8_000
+        assert restarted.scheduler.deadline('t1') == 200
+        assert restarted.scheduler.deadline('t2') == 50, (
+            'Самый старый просроченный опрос выполняется первым.'
+        )
+        assert restarted.scheduler.deadline('t0') == 50 + 600 * 2 / 4 / 2
+        assert restarted.scheduler.deadline('t3') == 50
+
+    def test_disabled_tenant_stays_disabled_after_restart(
+            self, monkeypatch, tmp_path
+    ):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                http_status=401
+            )
+        )
+        store = ScheduleStore(tmp_path / 'state.db')
+        engine, clock = make_engine(tenants_qty=1)
+        engine.bot.send_message = lambda **kwargs: None
+        engine.run_once()
+        assert 't0' in engine.disabled
+        engine.state_store = store
+        engine.save_state()
+        restarted, clock = make_engine(tenants_qty=1)
+        sent = []
+        restarted.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        restarted.restore(store.load())
+        assert restarted.disabled == engine.disabled
+        assert restarted.scheduler.deadline('t0') is None
+        clock.now = 1200
+        assert restarted.run_once() == 0
+        assert sent == [], 'Отключённый арендатор не уведомляется повторно.'
+
+    def test_fetch_goes_through_limiter(self, monkeypatch):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                random_timestamp=1
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        engine.limiter = AdaptiveLimiter(metrics=Metrics())
+        engine.run_once()
+        assert engine.limiter.latency is not None
+        assert engine.limiter.in_flight == 0
+
+    def test_delivery_latency_is_recorded(
+            self, monkeypatch, data_with_new_hw_status
+    ):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                data=data_with_new_hw_status
+            )
+        )
+        tracker = SloTracker(metrics=Metrics())
+        monkeypatch.setattr(homework, 'slo', tracker)
+        engine, clock = make_engine(tenants_qty=1)
+        engine.subscriptions = Subscriptions({'t0': [10, 11]})
+        engine.bot.send_message = lambda **kwargs: None
+        engine.run_once()
+        assert list(tracker.tenants) == ['t0']
+        assert tracker.overall.total == 1, (
+            'Задержка учитывается один раз на переход, а не на каждый чат.'
+        )
+
+    def test_pipeline_delivers_status(
+            self, monkeypatch, data_with_new_hw_status
+    ):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                data=data_with_new_hw_status
+            )
+        )
+        engine, clock = make_engine(tenants_qty=2)
+        engine.build_pipeline(fetch=2, check=1, render=1, deliver=2)
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        clock.now = 300
+        assert engine.run_once() == 2
+        engine.pipeline.join()
+        assert sorted(message['chat_id'] for message in sent) == [0, 1], (
+            'Каждый арендатор должен получить своё уведомление о той же '
+            'работе.'
+        )
+        engine.pipeline.close()
+
+    def test_pipeline_errors_alert_tenant(self, monkeypatch):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: check_utils.MockResponseGET(
+                http_status=500
+            )
+        )
+        engine, clock = make_engine(tenants_qty=1)
+        engine.build_pipeline()
+        sent = []
+        engine.bot.send_message = lambda **kwargs: sent.append(kwargs)
+        engine.run_once()
+        engine.pipeline.join()
+        assert 'Сбой в работе программы' in sent[0]['text']
+        engine.pipeline.close()
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from hedging import HedgeBudget, Hedger, LatencyTracker
+
+
+def make_hedger(p95=0.02, ratio=1.0):
+    tracker = LatencyTracker(default=p95)
+    return Hedger(tracker=tracker, budget=HedgeBudget(ratio=ratio))
+
+
+class TestHedging:
+
+    def test_fast_request_is_not_hedged(self):
+        hedger = make_hedger()
+        calls = []
+
+        def request():
+            calls.append(1)
+            return 'ok'
+
+        assert hedger.call(request) == 'ok'
+        assert len(calls) == 1, 'Быстрый запрос не должен дублироваться.'
+
+    def test_slow_request_is_hedged(self):
+        hedger = make_hedger()
+        calls = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                calls.append(1)
+                attempt = len(calls)
+            if attempt == 1:
+                time.sleep(0.5)
+                return 'slow'
+            return 'fast'
+
+        assert hedger.call(request) == 'fast', (
+            'Должен использоваться ответ, пришедший первым.'
+        )
+        assert len(calls) == 2
+
+    def test_budget_limits_hedges(self):
+        hedger = make_hedger(ratio=0.0)
+        hedger.budget.burst = 0
+        calls = []
+
+        def request():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'ok'
+
+        assert hedger.call(request) == 'ok'
+        assert len(calls) == 1, 'Бюджет хеджирования исчерпан.'
+
+    def test_error_of_first_is_masked_by_hedge(self):
+        hedger = make_hedger()
+        calls = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                calls.append(1)
+                attempt = len(calls)
+            if attempt == 1:
+                time.sleep(0.1)
+                raise ValueError('broken')
+            time.sleep(0.2)
+            return 'ok'
+
+        assert hedger.call(request) == 'ok'
+
+    def test_both_errors_are_raised(self):
+        hedger = make_hedger()
+
+        def request():
+            time.sleep(0.05)
+            raise ValueError('broken')
+
+        with pytest.raises(ValueError):
+            hedger.call(request)
+
+    def test_percentile(self):
+        tracker = LatencyTracker(min_samples=1)
+        for value in range(1, 101):
+            tracker.observe(value / 100)
+        assert tracker.percentile() == pytest.approx(0.95)
+        tracker.observe(1.01)
+        assert tracker.percentile() == pytest.approx(0.96), (
+            'p95 из 101 замера — 96-й по порядку.'
+        )
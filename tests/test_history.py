@@ -0,0 +1,76 @@
+from history import BatchWriter, HistoryStore, main, report
+from records import HomeworkRecord, HomeworkStatus
+
+
+def record(status, date_updated, id=1, lesson='Спринт 1'):
+    return HomeworkRecord(
+        f'hw{id}', HomeworkStatus(status), id=id,
+        date_updated=date_updated, lesson_name=lesson
+    )
+
+
+class TestHistory:
+
+    def test_turnaround_per_lesson(self, tmp_path):
+        store = HistoryStore(tmp_path / 'history.db')
+        store.insert_many([
+            ('t', record('reviewing', '2024-01-01T10:00:00Z'), 0),
+            ('t', record('rejected', '2024-01-01T12:00:00Z'), 0),
+            ('t', record('reviewing', '2024-01-02T10:00:00Z'), 0),
+            ('t', record('approved', '2024-01-02T11:00:00Z'), 0),
+            ('t', record('reviewing', '2024-01-01T10:00:00Z', id=2,
+                         lesson='Спринт 2'), 0),
+        ])
+        assert store.turnaround() == {'Спринт 1': [7200.0, 3600.0]}
+        assert len(store.transitions(tenant='t', lesson='Спринт 2')) == 1
+
+    def test_duplicates_are_ignored(self, tmp_path):
+        store = HistoryStore(tmp_path / 'history.db')
+        row = ('t', record('reviewing', '2024-01-01T10:00:00Z'), 0)
+        store.insert_many([row])
+        store.insert_many([row])
+        assert len(store.transitions()) == 1
+
+    def test_duplicates_without_date_are_ignored(self, tmp_path):
+        store = HistoryStore(tmp_path / 'history.db')
+        row = ('t', record('reviewing', None), 0)
+        store.insert_many([row])
+        store.insert_many([row])
+        assert len(store.transitions()) == 1
+
+    def test_batch_writer(self, tmp_path):
+        store = HistoryStore(tmp_path / 'history.db')
+        writer = BatchWriter(store, batch_size=2, interval=60)
+        writer.add('t', record('reviewing', '2024-01-01T10:00:00Z'))
+        assert store.transitions() == [], 'Запись выполняется пачками.'
+        writer.add('t', record('approved', '2024-01-01T11:00:00Z'))
+        writer.add('t', record('reviewing', '2024-01-01T10:00:00Z', id=2))
+        writer.close()
+        assert len(store.transitions()) == 3
+
+    def test_report_cli(self, tmp_path, capsys):
+        path = tmp_path / 'history.db'
+        store = HistoryStore(path)
+        store.insert_many([
+            ('t', record('reviewing', '2024-01-01T10:00:00Z'), 0),
+            ('t', record('approved', '2024-01-01T13:00:00Z'), 0),
+        ])
+        main(['report', '--db', str(path)])
+        output = capsys.readouterr().out
+        assert 'Спринт 1' in output
+        assert '3.0' in output
+
+    def test_report_p90_is_nearest_rank(self, tmp_path):
+        store = HistoryStore(tmp_path / 'history.db')
+        rows = []
+        for hours in range(1, 11):
+            rows.append(('t', record(
+                'reviewing', '2024-01-01T00:00:00Z', id=hours
+            ), 0))
+            rows.append(('t', record(
+                'approved', f'2024-01-01T{hours:02}:00:00Z', id=hours
+            ), 0))
+        store.insert_many(rows)
+        assert report(store)[1].split()[-1] == '9.0', (
+            'p90 из 10 значений — девятое по порядку, а не максимум.'
+        )
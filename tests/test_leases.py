@@ -0,0 +1,92 @@
+from leases import ShardLeaser, SQLiteLeaseStore, shard_of
+from tests.stand_ins import FakeClock
+
+
+class TestLeases:
+
+    def test_shard_has_single_owner(self, tmp_path):
+        clock = FakeClock(1000.0)
+        path = tmp_path / 'leases.db'
+        first = SQLiteLeaseStore(path, clock=clock)
+        second = SQLiteLeaseStore(path, clock=clock)
+        assert first.acquire(0, 'a', ttl=30)
+        assert not second.acquire(0, 'b', ttl=30)
+        assert first.acquire(0, 'a', ttl=30), 'Владелец продлевает аренду.'
+
+    def test_expired_lease_fails_over(self, tmp_path):
+        clock = FakeClock(1000.0)
+        store = SQLiteLeaseStore(tmp_path / 'leases.db', clock=clock)
+        store.acquire(0, 'a', ttl=30)
+        clock.now += 31
+        assert store.acquire(0, 'b', ttl=30)
+        assert not store.acquire(0, 'a', ttl=30)
+
+    def test_release(self, tmp_path):
+        clock = FakeClock(1000.0)
+        store = SQLiteLeaseStore(tmp_path / 'leases.db', clock=clock)
+        leaser = ShardLeaser(store, 'a', shards=4, clock=clock)
+        assert leaser.refresh() == {0, 1, 2, 3}
+        leaser.release_all()
+        assert store.acquire(2, 'b', ttl=30)
+
+    def test_replicas_split_tenants(self, tmp_path):
+        clock = FakeClock(1000.0)
+        store = SQLiteLeaseStore(tmp_path / 'leases.db', clock=clock)
+        active = ShardLeaser(store, 'a', shards=4, ttl=30, clock=clock)
+        standby = ShardLeaser(store, 'b', shards=4, ttl=30, clock=clock)
+        active.refresh()
+        standby.refresh()
+        tenants = [f'tenant{number}' for number in range(20)]
+        for tenant in tenants:
+            assert active.owns(tenant) != standby.owns(tenant), (
+                'Арендатора должна опрашивать ровно одна реплика.'
+            )
+        clock.now += 31
+        standby.refresh()
+        assert not active.owns(tenants[0]), (
+            'Без продления аренды реплика не должна опрашивать арендаторов.'
+        )
+        assert all(standby.owns(tenant) for tenant in tenants)
+
+    def test_cursors_are_shared(self, tmp_path):
+        path = tmp_path / 'leases.db'
+        first = SQLiteLeaseStore(path)
+        second = SQLiteLeaseStore(path)
+        first.save_cursor('t0', 100)
+        first.save_cursor('t0', 200)
+        assert second.load_cursors(['t0', 't1']) == {'t0': 200}
+        assert second.load_cursors([]) == {}
+
+    def test_acquired_shards_are_reported_once(self, tmp_path):
+        clock = FakeClock(1000.0)
+        store = SQLiteLeaseStore(tmp_path / 'leases.db', clock=clock)
+        store.acquire(1, 'b', ttl=30)
+        leaser = ShardLeaser(store, 'a', shards=2, clock=clock)
+        leaser.refresh()
+        assert leaser.take_acquired() == {0}
+        clock.now += 31
+        leaser.refresh()
+        assert leaser.take_acquired() == {1}
+        assert leaser.take_acquired() == set()
+
+    def test_slow_refresh_does_not_extend_ownership(self, tmp_path):
+        clock = FakeClock(1000.0)
+        store = SQLiteLeaseStore(tmp_path / 'leases.db', clock=clock)
+        acquire = store.acquire
+
+        def slow_acquire(shard, owner, ttl):
+            owned = acquire(shard, owner, ttl)
+            clock.now += 5
+            return owned
+
+        store.acquire = slow_acquire
+        leaser = ShardLeaser(store, 'a', shards=4, ttl=30, clock=clock)
+        started = clock.now
+        leaser.refresh()
+        clock.now = started + 30
+        assert not leaser.owns('t0'), (
+            'Владение не подтверждается дольше аренды первого шарда.'
+        )
+
+    def test_shard_of_is_stable(self):
+        assert shard_of('tenant', 16) == shard_of('tenant', 16)
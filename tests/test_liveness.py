@@ -0,0 +1,70 @@
+import json
+import urllib.error
+import urllib.request
+
+from liveness import Watchdog, dump_stacks
+from metrics import Metrics
+from tests.stand_ins import FakeClock
+
+
+class TestWatchdog:
+
+    def test_stall_is_detected_and_reported_once(self, caplog):
+        clock = FakeClock()
+        watchdog = Watchdog(60, clock=clock, metrics=Metrics())
+        watchdog.beat('main')
+        clock.now = 30
+        assert watchdog.check() == {}
+        clock.now = 100
+        assert watchdog.check() == {'main': 100}
+        watchdog.check()
+        critical = [
+            record for record in caplog.records
+            if record.levelname == 'CRITICAL'
+        ]
+        assert len(critical) == 1, 'Стеки выводятся один раз на зависание.'
+        assert 'MainThread' in critical[0].getMessage()
+        assert watchdog.metrics.get('watchdog_stalls', engine='main') == 1, (
+            'Зависание учитывается один раз, а не при каждой проверке.'
+        )
+        watchdog.beat('main')
+        assert watchdog.check() == {}
+
+    def test_idle_engine_is_not_stalled(self):
+        clock = FakeClock()
+        watchdog = Watchdog(60, clock=clock, metrics=Metrics())
+        watchdog.beat('main')
+        clock.now = 10
+        watchdog.idle('main')
+        clock.now = 1000
+        assert watchdog.check() == {}, (
+            'Ожидание следующей итерации не считается зависанием.'
+        )
+        watchdog.beat('main')
+        clock.now = 1061
+        assert watchdog.check() == {'main': 61}, (
+            'Зависание отсчитывается от начала итерации.'
+        )
+
+    def test_health_endpoint(self):
+        clock = FakeClock()
+        watchdog = Watchdog(60, clock=clock, metrics=Metrics())
+        watchdog.beat('main')
+        watchdog.start(port=0)
+        try:
+            port = watchdog.server.server_address[1]
+            url = f'http://127.0.0.1:{port}/health'
+            with urllib.request.urlopen(url) as response:
+                assert json.load(response)['status'] == 'ok'
+            clock.now = 100
+            try:
+                urllib.request.urlopen(url)
+            except urllib.error.HTTPError as error:
+                assert error.code == 503
+            else:
+                raise AssertionError('Ожидался ответ 503 при зависании.')
+        finally:
+            watchdog.stop()
+
+    def test_dump_stacks(self):
+        assert 'test_dump_stacks' in dump_stacks()
@@ -0,0 +1,108 @@
+import time
+import tracemalloc
+
+import pytest
+import requests
+
+import homework
+from memory import MemoryGuard
+from metrics import Metrics
+from ratelimit import TokenBucket
+
+CYCLES = 2000
+WARMUP = 200
+
+
+class BreakLoop(Exception):
+    pass
+
+
+class StatusResponse:
+    status_code = 200
+
+    def json(self):
+        return {
+            'homeworks': [{
+                'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+                'date_updated': '2024-01-01T10:00:00Z',
+                'lesson_name': 'Спринт 1',
+            }],
+            'current_date': int(time.time()),
+        }
+
+
+class SilentBot:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        return text
+
+
+@pytest.fixture
+def quiet_main(monkeypatch):
+    monkeypatch.setattr(homework.logger, 'handlers', [])
+    monkeypatch.setattr(homework.logger, 'propagate', False)
+    monkeypatch.setattr(homework.logger, 'level', homework.logger.level)
+    monkeypatch.setattr(homework, 'TeleBot', SilentBot)
+    for token in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID'):
+        monkeypatch.setattr(homework, token, 'token')
+    monkeypatch.setattr(homework, 'practicum_bucket', TokenBucket(1e9))
+    monkeypatch.setattr(
+        requests, 'get', lambda *args, **kwargs: StatusResponse()
+    )
+
+
+def run_main(monkeypatch, cycles, on_cycle=lambda cycle: None):
+    counter = iter(range(1, cycles + 1))
+
+    def sleep(seconds):
+        cycle = next(counter, None)
+        if cycle is None:
+            raise BreakLoop
+        on_cycle(cycle)
+
+    monkeypatch.setattr(homework.time, 'sleep', sleep)
+    with pytest.raises(BreakLoop):
+        homework.main()
+
+
+class TestMemory:
+
+    def test_main_adds_log_handler_once(self, monkeypatch, quiet_main):
+        for _ in range(3):
+            run_main(monkeypatch, cycles=1)
+        assert len(homework.logger.handlers) == 1
+
+    def test_soak_memory_is_bounded(self, monkeypatch, quiet_main):
+        homework.logger.setLevel('CRITICAL')
+        monkeypatch.setattr(homework, 'setup_logging', lambda: None)
+        traced = {}
+
+        def on_cycle(cycle):
+            if cycle in (WARMUP, CYCLES):
+                traced[cycle] = tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.start()
+        try:
+            run_main(monkeypatch, CYCLES, on_cycle)
+        finally:
+            tracemalloc.stop()
+        growth = traced[CYCLES] - traced[WARMUP]
+        assert growth < 64 * 1024, (
+            f'Память выросла на {growth} байт за {CYCLES - WARMUP} циклов.'
+        )
+
+    def test_guard_reports_growth(self):
+        metrics = Metrics()
+        guard = MemoryGuard(metrics=metrics)
+        tracemalloc.start()
+        try:
+            guard.check()
+            leak = [bytearray(1024) for _ in range(100)]
+            growth = guard.check()
+        finally:
+            tracemalloc.stop()
+        assert leak and growth[0].size_diff >= 100 * 1024
+        assert metrics.get('memory_rss_bytes') > 0
+        assert metrics.get('memory_traced_blocks') > 0
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from telebot import apihelper
+
+from message_ids import MessageIds
+
+
+class EditingBot:
+    def __init__(self, fail_edit=False):
+        self.fail_edit = fail_edit
+        self.sent = []
+        self.edited = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append(text)
+        return SimpleNamespace(message_id=len(self.sent))
+
+    def edit_message_text(self, text, chat_id=None, message_id=None):
+        if self.fail_edit:
+            raise apihelper.ApiException('message to edit not found',
+                                         'edit_message_text', None)
+        self.edited.append((message_id, text))
+
+
+class TestMessageIds:
+
+    def test_size_is_bounded(self):
+        message_ids = MessageIds(max_size=2)
+        for key in range(3):
+            message_ids.set(1, key, key + 100)
+        assert len(message_ids) == 2
+        assert message_ids.get(1, 0) is None
+        assert message_ids.get(1, 2) == 102
+
+    def test_status_message_is_edited(self, homework_module):
+        bot = EditingBot()
+        delivered, message_id = homework_module.edit_or_deliver(
+            bot, 1, 'reviewing'
+        )
+        assert (delivered, message_id) == (True, 1)
+        delivered, message_id = homework_module.edit_or_deliver(
+            bot, 1, 'approved', message_id
+        )
+        assert (delivered, message_id) == (True, 1)
+        assert bot.sent == ['reviewing']
+        assert bot.edited == [(1, 'approved')]
+
+    def test_failed_edit_falls_back_to_new_message(self, homework_module):
+        bot = EditingBot(fail_edit=True)
+        delivered, message_id = homework_module.edit_or_deliver(
+            bot, 1, 'approved', 5
+        )
+        assert delivered
+        assert message_id == 1
+        assert bot.sent == ['approved']
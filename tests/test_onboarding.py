@@ -0,0 +1,90 @@
+import pytest
+import requests
+from telebot import apihelper
+
+import homework
+import onboarding
+import tests.check_utils as check_utils
+from ratelimit import TokenBucket
+from retry import EndpointRetryPolicy
+from tenants import Tenant, TenantRegistry
+
+CSV = (
+    'name,practicum_token,chat_id\n'
+    'anna,good,1\n'
+    'boris,revoked,2\n'
+    'vera,good,404\n'
+    'anna,good,3\n'
+    'gleb,good,4\n'
+)
+
+
+class FakeBot:
+    def get_chat(self, chat_id):
+        if str(chat_id) == '404':
+            raise apihelper.ApiException('chat not found', 'getChat', None)
+        if str(chat_id) == '503':
+            raise requests.ConnectionError('connection reset')
+        return {'id': chat_id}
+
+
+class HtmlResponse(check_utils.MockResponseGET):
+    def json(self):
+        raise ValueError('Expecting value: line 1 column 1 (char 0)')
+
+
+@pytest.fixture(autouse=True)
+def practicum(monkeypatch):
+    def mock_get(url, headers=None, **kwargs):
+        if headers['Authorization'] == 'OAuth html':
+            return HtmlResponse()
+        revoked = headers['Authorization'] == 'OAuth revoked'
+        return check_utils.MockResponseGET(
+            http_status=401 if revoked else 200, random_timestamp=1
+        )
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    monkeypatch.setattr(homework, 'practicum_bucket', TokenBucket(1e9))
+    monkeypatch.setattr(
+        homework, 'fetch_retry', EndpointRetryPolicy(sleep=lambda delay: None)
+    )
+    monkeypatch.setattr(onboarding, 'build_bot', FakeBot)
+
+
+class TestOnboarding:
+
+    def test_registry_upserts_tenants(self, tmp_path):
+        registry = TenantRegistry(tmp_path / 'tenants.db')
+        registry.add_many([Tenant('a', 't1', 1), Tenant('b', 't2', 2)])
+        registry.add_many([Tenant('a', 't3', 3)])
+        assert [
+            (tenant.name, tenant.practicum_token, tenant.chat_id)
+            for tenant in registry.load()
+        ] == [('a', 't3', '3'), ('b', 't2', '2')]
+
+    def test_import_keeps_only_valid_tenants(self, tmp_path, capsys):
+        path = tmp_path / 'tenants.csv'
+        path.write_text(CSV, encoding='utf-8')
+        db = tmp_path / 'tenants.db'
+        assert onboarding.main([str(path), '--db', str(db)]) == 1
+        output = capsys.readouterr().out
+        assert 'Проверено: 5, прошли проверку: 1, отклонено: 4' in output
+        assert 'boris: токен Я.Практикум недействителен' in output
+        assert 'vera: чат 404 недоступен' in output
+        assert 'anna: имя повторяется в файле' in output
+        assert [tenant.name for tenant in TenantRegistry(db).load()] == [
+            'gleb'
+        ]
+
+    def test_unexpected_errors_reject_only_their_tenant(self):
+        tenants = [
+            Tenant('anna', 'html', 1), Tenant('boris', 'good', 503),
+            Tenant('gleb', 'good', 4),
+        ]
+        results = onboarding.validate_all(FakeBot(), tenants, workers=2)
+        problems = {tenant.name: found for tenant, found in results}
+        assert 'ошибка проверки токена' in problems['anna'][0]
+        assert 'ошибка проверки чата 503' in problems['boris'][0]
+        assert problems['gleb'] == [], (
+            'Ошибка одной строки не должна прерывать проверку остальных.'
+        )
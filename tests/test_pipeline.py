@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import defaultdict
+
+from liveness import Watchdog
+from metrics import Metrics
+from pipeline import Pipeline, Stage
+
+
+class TestPipeline:
+
+    def test_items_flow_through_stages(self):
+        results = []
+        pipeline = Pipeline([
+            Stage('double', lambda item: [item, item], workers=2),
+            Stage('square', lambda item: [item * item], workers=2),
+            Stage('collect', results.append),
+        ], metrics=Metrics())
+        for item in range(10):
+            pipeline.submit(item)
+        pipeline.join()
+        assert sorted(results) == sorted(
+            [item * item for item in range(10)] * 2
+        )
+        pipeline.close()
+
+    def test_keyed_stage_keeps_order(self):
+        received = defaultdict(list)
+        pipeline = Pipeline([
+            Stage('deliver', lambda item: received[item[0]].append(item[1]),
+                  workers=4, key=lambda item: item[0]),
+        ], metrics=Metrics())
+        for number in range(100):
+            pipeline.submit((number % 5, number))
+        pipeline.close()
+        for numbers in received.values():
+            assert numbers == sorted(numbers)
+
+    def test_backpressure(self):
+        release = threading.Event()
+        metrics = Metrics()
+        pipeline = Pipeline([
+            Stage('slow', lambda item: release.wait(1) and None,
+                  maxsize=2),
+        ], metrics=metrics)
+        submitted = []
+
+        def producer():
+            for item in range(5):
+                pipeline.submit(item)
+                submitted.append(item)
+
+        thread = threading.Thread(target=producer, daemon=True)
+        thread.start()
+        time.sleep(0.1)
+        assert len(submitted) < 5, (
+            'Заполненная очередь стадии должна блокировать отправку.'
+        )
+        assert metrics.get('pipeline_queue_depth', stage='slow') == 2
+        release.set()
+        thread.join(1)
+        pipeline.close()
+        assert len(submitted) == 5
+
+    def test_errors_are_reported(self):
+        errors = []
+
+        def fail(item):
+            raise ValueError(item)
+
+        pipeline = Pipeline(
+            [Stage('fail', fail)],
+            on_error=lambda stage, item, error: errors.append(
+                (stage.name, item)
+            ),
+            metrics=Metrics()
+        )
+        pipeline.submit(1)
+        pipeline.close()
+        assert errors == [('fail', 1)]
+
+    def test_hung_worker_is_visible_to_watchdog(self):
+        release = threading.Event()
+        watchdog = Watchdog(0.05, metrics=Metrics())
+        pipeline = Pipeline(
+            [Stage('fetch', lambda item: release.wait(1) and None)],
+            metrics=Metrics(), watchdog=watchdog
+        )
+        pipeline.submit(1)
+        time.sleep(0.1)
+        assert list(watchdog.stalled()) == ['fetch-0']
+        release.set()
+        pipeline.close()
+        assert watchdog.stalled() == {}
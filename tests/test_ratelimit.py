@@ -0,0 +1,55 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+import tests.check_utils as check_utils
+from exceptions import RateLimitException
+from ratelimit import TokenBucket, parse_retry_after
+from tests.stand_ins import FakeClock
+
+
+class TestTokenBucket:
+
+    def test_rate_is_limited(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=2, clock=clock, sleep=clock.sleep)
+        for _ in range(6):
+            bucket.acquire()
+        assert clock.now == pytest.approx(2), (
+            'После исчерпания запаса токены выдаются со скоростью rate.'
+        )
+
+    def test_pause_blocks_all_requests(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+        bucket.pause(30)
+        assert not bucket.try_acquire()
+        assert bucket.acquire() == pytest.approx(30)
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('120', 60) == 120
+        assert parse_retry_after(None, 60) == 60
+        assert parse_retry_after('garbage', 60) == 60
+        moment = email.utils.formatdate(time.time() + 100, usegmt=True)
+        assert 90 < parse_retry_after(moment, 60) <= 100
+
+
+class TestRetryAfter:
+
+    def test_429_pauses_bucket(self, monkeypatch, homework_module):
+        clock = FakeClock()
+        bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+        monkeypatch.setattr(homework_module, 'practicum_bucket', bucket)
+
+        def mock_get(*args, **kwargs):
+            response = check_utils.MockResponseGET(http_status=429)
+            response.headers = {'Retry-After': '42'}
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        with pytest.raises(RateLimitException) as error:
+            homework_module.get_api_answer(0)
+        assert error.value.retry_after == 42
+        assert bucket.acquire() == pytest.approx(42)
@@ -0,0 +1,61 @@
+import pytest
+import requests
+from telebot import apihelper
+
+import tests.check_utils as check_utils
+from recording import Recorder, Replay
+
+
+class TestRecording:
+
+    def record(self, path, data):
+        recorder = Recorder(path)
+
+        def get(url, **kwargs):
+            return check_utils.MockResponseGET(data=data)
+
+        response = recorder.get(
+            get, 'https://example.com', params={'from_date': 1},
+            headers={'Authorization': 'OAuth secret'}
+        )
+        assert response.json() == data
+        bot = recorder.wrap_bot(check_utils.MockTelegramBot())
+        bot.send_message(chat_id=1, text='hello')
+        recorder.close()
+        return recorder
+
+    def test_replay_returns_recorded_traffic(
+            self, tmp_path, data_with_new_hw_status
+    ):
+        path = tmp_path / 'traffic.jsonl.gz'
+        self.record(path, data_with_new_hw_status)
+        assert b'secret' not in path.read_bytes()
+        delays = []
+        replay = Replay(path, speed=10, sleep=delays.append)
+        response = replay.get('https://example.com', params={})
+        assert response.status_code == 200
+        assert response.json() == data_with_new_hw_status
+        assert replay.bot().send_message(chat_id=1, text='hello')
+        assert len(delays) == 2
+
+    def test_replay_exhausted(self, tmp_path, data_with_new_hw_status):
+        path = tmp_path / 'traffic.jsonl.gz'
+        self.record(path, data_with_new_hw_status)
+        replay = Replay(path, speed=0)
+        replay.get('https://example.com')
+        with pytest.raises(requests.RequestException):
+            replay.get('https://example.com')
+        replay.bot().send_message(chat_id=1, text='hello')
+        with pytest.raises(apihelper.ApiException):
+            replay.bot().send_message(chat_id=1, text='hello')
+
+    def test_replay_in_pipeline(
+            self, tmp_path, monkeypatch, homework_module,
+            data_with_new_hw_status
+    ):
+        path = tmp_path / 'traffic.jsonl.gz'
+        self.record(path, data_with_new_hw_status)
+        monkeypatch.setattr(homework_module, 'replay', Replay(path, speed=0))
+        response = homework_module.get_api_answer(0)
+        record = homework_module.check_response(response)
+        assert record.name == 'hw123.zip'
@@ -0,0 +1,30 @@
+import pytest
+
+from records import HomeworkRecord, HomeworkStatus
+
+
+class TestHomeworkRecord:
+
+    def test_from_api_keeps_used_fields(self, data_with_new_hw_status):
+        homework = data_with_new_hw_status['homeworks'][0]
+        record = HomeworkRecord.from_api(homework)
+        assert record.id == homework['id']
+        assert record.name == homework['homework_name']
+        assert record.status is HomeworkStatus.APPROVED
+        assert record.date_updated == homework['date_updated']
+        assert not hasattr(record, '__dict__'), (
+            'Запись должна хранить поля в __slots__.'
+        )
+
+    @pytest.mark.parametrize('homework', [
+        {'homework_name': 'hw123'},
+        {'status': 'approved'},
+        {'homework_name': 'hw123', 'status': 'unknown'},
+    ])
+    def test_from_api_invalid(self, homework):
+        with pytest.raises(KeyError):
+            HomeworkRecord.from_api(homework)
+
+    def test_key_falls_back_to_name(self):
+        record = HomeworkRecord('hw123', HomeworkStatus.REVIEWING)
+        assert record.key == 'hw123'
@@ -0,0 +1,84 @@
+import pytest
+import requests
+
+import homework
+import tests.check_utils as check_utils
+from exceptions import EndpointException, RateLimitException
+from ratelimit import TokenBucket
+from retry import EndpointRetryPolicy
+
+
+def fail(error):
+    raise error
+
+
+class TestRetry:
+
+    @pytest.mark.parametrize('code, retryable, fatal', [
+        (None, True, False),
+        (502, True, False),
+        (408, True, False),
+        (401, False, True),
+        (404, False, True),
+        (204, False, False),
+    ])
+    def test_endpoint_error_classes(self, code, retryable, fatal):
+        error = EndpointException('endpoint', code)
+        assert error.retryable is retryable
+        assert error.fatal is fatal
+
+    def test_only_transient_errors_are_retried(self):
+        delays = []
+        policy = EndpointRetryPolicy(attempts=3, sleep=delays.append)
+        errors = iter([
+            EndpointException('endpoint', 503), EndpointException('endpoint')
+        ])
+
+        def flaky():
+            error = next(errors, None)
+            if error is not None:
+                raise error
+            return 'ok'
+
+        assert policy.call(flaky) == 'ok'
+        assert len(delays) == 2
+        for error in (
+            EndpointException('endpoint', 401),
+            RateLimitException('endpoint', 429, 1),
+            KeyError('current_date'),
+        ):
+            with pytest.raises(type(error)):
+                policy.call(fail, error)
+        assert len(delays) == 2
+
+    def test_main_stops_polling_after_fatal_error(self, monkeypatch):
+        timeouts = []
+        sent = []
+        cycles = iter(range(3))
+
+        def mock_get(*args, **kwargs):
+            timeouts.append(kwargs.get('timeout'))
+            return check_utils.MockResponseGET(http_status=401)
+
+        def sleep(seconds):
+            if next(cycles, None) is None:
+                raise check_utils.BreakInfiniteLoop
+
+        class Bot(check_utils.MockTelegramBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                sent.append(text)
+
+        for token in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID'):
+            monkeypatch.setattr(homework, token, 'token')
+        monkeypatch.setattr(homework, 'setup_logging', lambda: None)
+        monkeypatch.setattr(homework, 'TeleBot', Bot)
+        monkeypatch.setattr(homework, 'practicum_bucket', TokenBucket(1e9))
+        monkeypatch.setattr(homework.time, 'sleep', sleep)
+        monkeypatch.setattr(requests, 'get', mock_get)
+        with pytest.raises(check_utils.BreakInfiniteLoop):
+            homework.main()
+        assert timeouts == [homework.REQUEST_TIMEOUT], (
+            'После постоянной ошибки опрос прекращается, а запрос к API '
+            'выполняется с таймаутом.'
+        )
+        assert len(sent) == 1
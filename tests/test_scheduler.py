@@ -0,0 +1,42 @@
+from scheduler import DeadlineScheduler
+
+
+class TestDeadlineScheduler:
+
+    def test_pop_due_in_deadline_order(self):
+        scheduler = DeadlineScheduler()
+        scheduler.schedule('b', 20)
+        scheduler.schedule('a', 10)
+        scheduler.schedule('c', 30)
+        assert scheduler.pop_due(25) == [('a', 10), ('b', 20)]
+        assert len(scheduler) == 1
+        assert scheduler.next_deadline() == 30
+
+    def test_reschedule_replaces_deadline(self):
+        scheduler = DeadlineScheduler()
+        scheduler.schedule('a', 10)
+        scheduler.schedule('a', 50)
+        assert scheduler.pop_due(20) == []
+        assert scheduler.deadline('a') == 50
+        assert scheduler.pop_due(50) == [('a', 50)]
+        assert scheduler.next_deadline() is None
+
+    def test_remove(self):
+        scheduler = DeadlineScheduler()
+        scheduler.schedule('a', 10)
+        scheduler.remove('a')
+        assert 'a' not in scheduler
+        assert scheduler.pop_due(100) == []
+
+    def test_spread_is_even(self):
+        scheduler = DeadlineScheduler()
+        scheduler.spread(range(4), period=600, start=1000)
+        assert [scheduler.deadline(key) for key in range(4)] == [
+            1000, 1150, 1300, 1450
+        ]
+
+    def test_heap_is_compacted(self):
+        scheduler = DeadlineScheduler()
+        for deadline in range(1000):
+            scheduler.schedule('a', deadline)
+        assert len(scheduler._heap) < 100
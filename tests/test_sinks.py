@@ -0,0 +1,108 @@
+import threading
+from email import message_from_bytes
+from email.policy import default
+
+import pytest
+
+from metrics import Metrics
+from retry import RetryPolicy
+from sinks import (
+    Notifier, Sink, SinkWorker, SmtpSink, WebhookSink, load_smtp_routes
+)
+from tests.stand_ins import SmtpServer, WebhookServer
+
+
+def no_wait_policy(attempts=3):
+    return RetryPolicy(attempts=attempts, sleep=lambda delay: None)
+
+
+class BlockingSink(Sink):
+    name = 'blocking'
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def send(self, chat_id, message):
+        self.release.wait(1)
+
+
+class TestSinks:
+
+    def test_webhook_sink_retries(self):
+        with WebhookServer(fail_first=1) as server:
+            worker = SinkWorker(
+                WebhookSink(server.url), no_wait_policy(), metrics=Metrics()
+            )
+            worker.put(1, 'Работа проверена')
+            worker.close()
+        assert server.received == [{'chat_id': 1, 'text': 'Работа проверена'}]
+
+    def test_smtp_sink(self):
+        with SmtpServer() as server:
+            sink = SmtpSink('127.0.0.1', server.port, 'bot@localhost',
+                            ['mentor@localhost'])
+            sink.send(1, 'Работа проверена')
+        assert len(server.messages) == 1
+        assert 'mentor@localhost' in server.messages[0]
+
+    def test_smtp_routes_by_chat(self, tmp_path):
+        path = tmp_path / 'routes.csv'
+        path.write_text(
+            'chat_id,email\n1,anna@localhost\n2,boris@localhost\n',
+            encoding='utf-8'
+        )
+        with SmtpServer() as server:
+            sink = SmtpSink('127.0.0.1', server.port, 'bot@localhost',
+                            routes=load_smtp_routes(path))
+            sink.send(1, 'Работа проверена')
+            sink.send(3, 'Работа проверена')
+        assert len(server.messages) == 1, (
+            'Письмо о чате без получателей не отправляется.'
+        )
+        email = message_from_bytes(
+            server.messages[0].encode(), policy=default
+        )
+        assert email['To'] == 'anna@localhost'
+        assert 'чат 1' in email['Subject']
+        assert 'Чат 1' in email.get_content()
+
+    def test_smtp_recipients_skip_blanks(self):
+        sink = SmtpSink('127.0.0.1', 25, 'bot@localhost', ['a@x', ' ', ''])
+        assert sink.recipients == ['a@x']
+        with pytest.raises(ValueError):
+            SmtpSink('127.0.0.1', 25, 'bot@localhost', ''.split(','))
+
+    def test_slow_sink_does_not_delay_others(self):
+        blocking = BlockingSink()
+        metrics = Metrics()
+        with WebhookServer() as server:
+            notifier = Notifier([
+                SinkWorker(blocking, no_wait_policy(), maxsize=1,
+                           metrics=metrics),
+                SinkWorker(WebhookSink(server.url), no_wait_policy(),
+                           metrics=metrics),
+            ])
+            for number in range(3):
+                notifier.notify(number, 'message')
+            notifier.workers[1].join()
+            assert len(server.received) == 3, (
+                'Медленный канал не должен задерживать остальные.'
+            )
+            blocking.release.set()
+            notifier.close()
+        assert metrics.get('sink_dropped', sink='blocking') >= 1
+
+    def test_retry_policy_gives_up(self):
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError('broken')
+
+        policy = no_wait_policy(attempts=3)
+        try:
+            policy.call(fail)
+        except ValueError:
+            pass
+        assert len(calls) == 3
+        assert 0 <= policy.delay(10) <= policy.max_delay
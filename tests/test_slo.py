@@ -0,0 +1,49 @@
+from metrics import Metrics
+from slo import LatencyHistogram, SloTracker
+
+UPDATED = '2024-01-01T10:00:00Z'
+UPDATED_AT = 1704103200.0
+
+
+class TestSlo:
+
+    def test_histogram_quantiles(self):
+        histogram = LatencyHistogram(bounds=(10, 60, 600))
+        for value in (5, 10, 30, 50, 700):
+            histogram.observe(value)
+        assert histogram.counts == [2, 2, 0, 1]
+        assert histogram.within(60) == 0.8
+        assert histogram.quantile(0.5) == 60
+        assert histogram.quantile(0.99) == float('inf')
+        assert histogram.cumulative()[-2:] == [(600, 4), ('+Inf', 5)]
+
+    def test_attainment_per_tenant(self):
+        metrics = Metrics()
+        tracker = SloTracker(target=600, metrics=metrics)
+        assert tracker.observe('a', UPDATED, UPDATED_AT + 120) == 120
+        tracker.observe('a', UPDATED, UPDATED_AT + 3000)
+        tracker.observe('b', UPDATED, UPDATED_AT + 30)
+        assert metrics.get('slo_attainment', tenant='a') == 0.5
+        assert metrics.get('slo_attainment', tenant='b') == 1.0
+        assert metrics.get('slo_attainment') == 2 / 3
+        assert metrics.get(
+            'notification_latency_seconds_bucket', le='+Inf'
+        ) == 3
+        assert metrics.get('notification_latency_seconds_bucket', le=600) == 2
+        assert len(tracker.report()) == 4
+
+    def test_target_outside_buckets_is_exact(self):
+        metrics = Metrics()
+        tracker = SloTracker(target=450, metrics=metrics)
+        assert 450 in tracker.bounds
+        tracker.observe('a', UPDATED, UPDATED_AT + 400)
+        tracker.observe('a', UPDATED, UPDATED_AT + 500)
+        assert metrics.get('slo_attainment', tenant='a') == 0.5, (
+            'Уведомление за 400 с укладывается в цель 450 с.'
+        )
+
+    def test_missing_or_invalid_date_is_skipped(self):
+        tracker = SloTracker(metrics=Metrics())
+        assert tracker.observe('a', None) is None
+        assert tracker.observe('a', 'вчера') is None
+        assert tracker.overall.total == 0
@@ -0,0 +1,22 @@
+from subscriptions import Subscriptions, load_subscriptions
+from tenants import Tenant
+
+
+class TestSubscriptions:
+
+    def test_chats_for_tenant(self):
+        tenant = Tenant('student', 'token', '1')
+        subscriptions = Subscriptions({'student': ['2', '3', '1']})
+        assert subscriptions.chats_for(tenant) == ['1', '2', '3']
+        subscriptions.unsubscribe('student', '2')
+        assert subscriptions.chats_for(tenant) == ['1', '3']
+        assert Subscriptions().chats_for(tenant) == ['1']
+
+    def test_load_subscriptions(self, tmp_path):
+        path = tmp_path / 'subscriptions.csv'
+        path.write_text(
+            'tenant,chat_id\nstudent,2\nstudent,3\nstudent,2\n',
+            encoding='utf-8'
+        )
+        subscriptions = load_subscriptions(path)
+        assert subscriptions.chats['student'] == ['2', '3']
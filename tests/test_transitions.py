@@ -0,0 +1,51 @@
+from records import HomeworkRecord, HomeworkStatus
+from transitions import TransitionIndex
+
+
+def record(status, date_updated, id=1):
+    return HomeworkRecord(
+        'hw123', HomeworkStatus(status), id=id, date_updated=date_updated
+    )
+
+
+class TestTransitionIndex:
+
+    def test_only_status_changes_are_transitions(self):
+        index = TransitionIndex()
+        assert index.is_transition(record('reviewing', '2024-01-01T10:00Z'))
+        assert not index.is_transition(
+            record('reviewing', '2024-01-01T10:00Z')
+        ), 'Повторное событие не должно считаться переходом.'
+        assert not index.is_transition(
+            record('reviewing', '2024-01-01T11:00Z')
+        ), 'Изменение без смены статуса не должно считаться переходом.'
+        assert index.is_transition(record('approved', '2024-01-02T10:00Z'))
+
+    def test_stale_event_is_ignored(self):
+        index = TransitionIndex()
+        index.is_transition(record('approved', '2024-01-02T10:00Z'))
+        assert not index.is_transition(
+            record('reviewing', '2024-01-01T10:00Z')
+        )
+        assert index.get(1) == (
+            HomeworkStatus.APPROVED, '2024-01-02T10:00Z'
+        )
+
+    def test_size_is_bounded(self):
+        index = TransitionIndex(max_size=2)
+        for id in range(3):
+            index.is_transition(record('reviewing', None, id=id))
+        assert len(index) == 2
+        assert 0 not in index
+
+    def test_scopes_are_independent(self):
+        index = TransitionIndex()
+        assert index.is_transition(
+            record('approved', '2024-01-02T10:00Z'), 't0'
+        )
+        assert index.is_transition(
+            record('approved', '2024-01-02T10:00Z'), 't1'
+        ), 'Статус одной работы у разных арендаторов учитывается отдельно.'
+        assert index.get(('t0', 1)) == (
+            HomeworkStatus.APPROVED, '2024-01-02T10:00Z'
+        )
@@ -0,0 +1,50 @@
+import requests
+
+import homework
+import tests.check_utils as check_utils
+from metrics import Metrics
+from ratelimit import TokenBucket
+from tests.stand_ins import StatusesServer
+from transport import ACCEPT_ENCODING, account, request_size, response_sizes
+
+
+class TestTransport:
+
+    def test_compressed_response_is_accounted(self):
+        data = {'homeworks': [{'status': 'approved'}] * 200, 'current_date': 1}
+        metrics = Metrics()
+        with StatusesServer(data) as server:
+            headers = {'Accept-Encoding': ACCEPT_ENCODING}
+            response = requests.get(server.url, headers=headers)
+            account('t', server.url, headers, {'from_date': 0}, response,
+                    metrics)
+        assert server.accept_encoding.startswith('gzip')
+        assert response.json() == data
+        endpoint = '/api/user_api/homework_statuses/'
+        wire = metrics.get('http_response_bytes', tenant='t',
+                           endpoint=endpoint)
+        decoded = metrics.get('http_response_decoded_bytes', tenant='t',
+                              endpoint=endpoint)
+        assert 0 < wire < decoded / 10
+        assert metrics.get('http_request_bytes', tenant='t',
+                           endpoint=endpoint) > len(endpoint)
+
+    def test_response_without_transport_details(self):
+        response = check_utils.MockResponseGET()
+        assert response_sizes(response) == (0, 0)
+        assert request_size('http://host/path', params={'a': 1}) == len(
+            'GET /path?a=1 HTTP/1.1\r\nHost: host\r\n\r\n'
+        )
+
+    def test_fetch_statuses_requests_compression(self, monkeypatch):
+        calls = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(kwargs)
+            return check_utils.MockResponseGET(random_timestamp=1)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(homework, 'practicum_bucket', TokenBucket(1e9))
+        homework.fetch_statuses(0, homework.HEADERS, tenant='t')
+        assert calls[0]['headers']['Accept-Encoding'] == ACCEPT_ENCODING
+        assert 'Accept-Encoding' not in homework.HEADERS
@@ -0,0 +1,58 @@
+import json
+
+from metrics import Metrics
+from records import HomeworkStatus
+from validation import HomeworkValidator, Quarantine
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+class TestValidation:
+
+    def test_validate_many_splits_records(self):
+        validator = HomeworkValidator(STATUSES)
+        records, rejected = validator.validate_many([
+            {'homework_name': 'hw1', 'status': 'approved', 'id': 1},
+            {'status': 'approved'},
+            {'homework_name': 'hw3'},
+            {'homework_name': 'hw4', 'status': 'unknown'},
+            'hw5',
+        ])
+        assert [record.name for record in records] == ['hw1']
+        assert records[0].status is HomeworkStatus.APPROVED
+        assert [reason for _, reason in rejected] == [
+            'missing_homework_name', 'missing_status',
+            'unknown_status', 'not_a_dict'
+        ]
+
+    def test_unhashable_status_is_unknown(self):
+        validator = HomeworkValidator(STATUSES)
+        for status in ([], {}, 1):
+            assert validator.validate(
+                {'homework_name': 'a', 'status': status}
+            ) == (None, 'unknown_status')
+
+    def test_quarantine_counts_and_writes(self, tmp_path):
+        path = tmp_path / 'quarantine.jsonl'
+        metrics = Metrics()
+        quarantine = Quarantine(path, metrics=metrics)
+        quarantine.extend([({'status': 'approved'}, 'missing_homework_name')])
+        quarantine.add({'homework_name': 'hw'}, 'missing_status')
+        assert metrics.get(
+            'homeworks_quarantined', reason='missing_status'
+        ) == 1
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert json.loads(lines[0])['homework'] == {'status': 'approved'}
+        assert len(quarantine.recent) == 2
+
+    def test_check_response_skips_bad_records(self, homework_module):
+        record = homework_module.check_response({
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'unknown'},
+            ],
+            'current_date': 0
+        })
+        assert record.name == 'hw1', (
+            'Некорректная работа не должна прерывать обработку ответа.'
+        )
@@ -0,0 +1,64 @@
+"""
+Индекс переходов статусов домашних работ.
+
+Хранит последний известный статус и дату обновления каждой работы,
+чтобы сообщения отправлялись только при реальной смене статуса.
+"""
+import threading
+from collections import OrderedDict
+
+
+class TransitionIndex:
+    """Последние статусы домашних работ с ограниченным размером.
+
+    При превышении max_size вытесняются работы,
+    которые дольше всего не встречались в ответах API.
+    """
+
+    def __init__(self, max_size=100_000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Последние статус и дата обновления работы или None."""
+        return self._entries.get(key)
+
+    def is_transition(self, record, scope=None):
+        """Проверка, что запись означает смену статуса.
+
+        Повторно полученные события, события старше уже известного
+        и изменения без смены статуса (например, правка комментария
+        ревьюера) переходом не считаются. Статусы с разными scope
+        (например, разных арендаторов) учитываются независимо.
+        """
+        key = record.key if scope is None else (scope, record.key)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._entries.move_to_end(key)
+                status, date_updated = previous
+                if is_stale(record.date_updated, date_updated):
+                    return False
+                self._entries[key] = (record.status, record.date_updated)
+                return status is not record.status
+            self._entries[key] = (record.status, record.date_updated)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+
+def is_stale(date_updated, known_date_updated):
+    """Проверка, что событие старше уже известного.
+
+    Даты в формате ISO 8601 UTC сравниваются как строки.
+    """
+    if date_updated is None or known_date_updated is None:
+        return False
+    return date_updated < known_date_updated
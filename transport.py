@@ -0,0 +1,73 @@
+"""
+Сжатие ответов и учёт трафика HTTP-запросов.
+
+Запросы объявляют поддерживаемые кодировки в Accept-Encoding:
+gzip и deflate всегда, br — если установлен пакет brotli (или
+brotlicffi), которым urllib3 распаковывает такие ответы.
+
+Объём трафика считается по арендаторам и эндпоинтам в метриках
+http_request_bytes, http_response_bytes (байты по сети, то есть
+после сжатия) и http_response_decoded_bytes (после распаковки).
+"""
+import importlib.util
+from urllib.parse import urlencode, urlsplit
+
+from metrics import registry
+
+ENCODINGS = ['gzip', 'deflate']
+if any(
+    importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi')
+):
+    ENCODINGS.append('br')
+ACCEPT_ENCODING = ', '.join(ENCODINGS)
+
+
+def request_size(url, headers=None, params=None):
+    """Оценка размера GET-запроса: строка запроса и заголовки."""
+    parts = urlsplit(url)
+    target = parts.path or '/'
+    if params:
+        target = f'{target}?{urlencode(params)}'
+    size = len(f'GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n')
+    for name, value in (headers or {}).items():
+        size += len(name) + len(str(value)) + 4
+    return size + 2
+
+
+def response_sizes(response):
+    """Размер ответа по сети и после распаковки, в байтах.
+
+    Размер по сети берётся из счётчика urllib3, затем из заголовка
+    Content-Length; ответы без них (заглушки, воспроизведение записи)
+    считаются по распакованному телу.
+    """
+    content = getattr(response, 'content', None)
+    if content is None:
+        content = getattr(response, 'text', '').encode()
+    decoded = len(content)
+    wire = None
+    raw = getattr(response, 'raw', None)
+    if raw is not None and hasattr(raw, 'tell'):
+        wire = raw.tell() or None
+    if wire is None:
+        headers = getattr(response, 'headers', None) or {}
+        length = headers.get('Content-Length')
+        wire = int(length) if length and length.isdigit() else decoded
+    return wire, decoded
+
+
+def account(tenant, url, headers, params, response, metrics=registry):
+    """Учёт трафика одного запроса в метриках."""
+    endpoint = urlsplit(url).path
+    wire, decoded = response_sizes(response)
+    metrics.increment(
+        'http_request_bytes', request_size(url, headers, params),
+        tenant=tenant, endpoint=endpoint
+    )
+    metrics.increment(
+        'http_response_bytes', wire, tenant=tenant, endpoint=endpoint
+    )
+    metrics.increment(
+        'http_response_decoded_bytes', decoded,
+        tenant=tenant, endpoint=endpoint
+    )
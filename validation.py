@@ -0,0 +1,102 @@
+"""
+Проверка домашних работ из ответа API.
+
+Некорректные работы (без обязательных ключей, с неизвестным статусом)
+не прерывают обработку ответа: они помещаются в карантин, а корректные
+работы обрабатываются дальше.
+"""
+import json
+import logging
+from collections import deque
+
+from metrics import registry
+from records import HomeworkRecord, HomeworkStatus
+
+logger = logging.getLogger(__name__)
+
+
+class HomeworkValidator:
+    """Валидатор домашних работ.
+
+    Допустимые статусы заранее отображаются в члены HomeworkStatus,
+    поэтому проверка записи сводится к нескольким поискам в словарях.
+    """
+
+    def __init__(self, statuses):
+        self.statuses = {status: HomeworkStatus(status) for status in statuses}
+
+    def validate(self, homework):
+        """Проверка одной работы.
+
+        Возвращается пара (запись, None) либо (None, причина отказа).
+        """
+        if not isinstance(homework, dict):
+            return None, 'not_a_dict'
+        name = homework.get('homework_name')
+        if name is None:
+            return None, 'missing_homework_name'
+        status = homework.get('status')
+        if status is None:
+            return None, 'missing_status'
+        status = (
+            self.statuses.get(status) if isinstance(status, str) else None
+        )
+        if status is None:
+            return None, 'unknown_status'
+        return HomeworkRecord(
+            name, status, homework.get('id'), homework.get('date_updated'),
+            homework.get('lesson_name')
+        ), None
+
+    def validate_many(self, homeworks):
+        """Проверка списка работ.
+
+        Возвращаются список корректных записей и список пар
+        (работа, причина отказа) для некорректных.
+        """
+        records = []
+        rejected = []
+        validate = self.validate
+        for homework in homeworks:
+            record, reason = validate(homework)
+            if record is None:
+                rejected.append((homework, reason))
+            else:
+                records.append(record)
+        return records, rejected
+
+
+class Quarantine:
+    """Карантин некорректных домашних работ.
+
+    Работы логируются, учитываются в метриках по причине отказа
+    и при заданном path дописываются в JSONL-файл.
+    """
+
+    def __init__(self, path=None, keep=100, metrics=registry):
+        self.path = path
+        self.recent = deque(maxlen=keep)
+        self.metrics = metrics
+
+    def add(self, homework, reason):
+        """Помещение работы в карантин."""
+        self.extend([(homework, reason)])
+
+    def extend(self, rejected):
+        """Помещение в карантин списка пар (работа, причина)."""
+        for homework, reason in rejected:
+            self.recent.append((homework, reason))
+            self.metrics.increment('homeworks_quarantined', reason=reason)
+            logger.warning(
+                f'Домашняя работа помещена в карантин ({reason}): '
+                f'{homework!r}'
+            )
+        if self.path and rejected:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.writelines(
+                    json.dumps(
+                        {'reason': reason, 'homework': homework},
+                        ensure_ascii=False, default=str
+                    ) + '\n'
+                    for homework, reason in rejected
+                )